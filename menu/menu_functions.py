@@ -18,6 +18,8 @@ from menu.menu_classes import (
 )
 
 sleep_in_seconds = 0.2
+# most solutions opened in browser at once
+max_previews = 5
 
 
 def sleep(multiple):
@@ -70,8 +72,9 @@ def create_menu_objects(dict_import: dict) -> Menu:
 
 
 def solve_maze() -> None:
-    maze = Maze.load(parse_path())
-    solutions = solve_all(maze)
+    path = parse_path()
+    maze = Maze.load(path)
+    solutions = solve_all(maze, path=path, max_paths=max_previews)
     if solutions:
         renderer = SVGRenderer()
         for solution in solutions:
@@ -13,7 +13,7 @@ def main() -> None:
 
 
 def build_maze() -> Maze:
-    return Maze(
+    return Maze.from_squares(
         squares=(
             Square(0, 0, 0, Border.TOP | Border.LEFT),
             Square(1, 0, 1, Border.TOP | Border.RIGHT),
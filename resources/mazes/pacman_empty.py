@@ -13,7 +13,7 @@ def main() -> None:
 
 
 def build_maze() -> Maze:
-    return Maze(
+    return Maze.from_squares(
         squares=(
             Square(index=0, row=0, column=0, border=Border.TOP | Border.LEFT),
             Square(index=1, row=0, column=1, border=Border.TOP | Border.BOTTOM),
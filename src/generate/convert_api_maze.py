@@ -1,4 +1,4 @@
-from src.models.border import Border
+from src.models.border_table import BITS, BORDERS
 from src.models.square import Square
 from src.models.role import Role
 from src.models.maze import Maze
@@ -71,7 +71,8 @@ def generate_maze(maze_dict, maze_dim) -> Maze:
         column = 0
         for j in range(1, maze_dim["width"], 2):
             role = Role.NONE
-            border = Border.EMPTY
+            # border nibble as a plain integer, turned into a border once per square
+            border = 0
             for direction, offset in offsets.items():
                 io = i + offset[0]
                 jo = j + offset[-1]
@@ -82,19 +83,16 @@ def generate_maze(maze_dict, maze_dim) -> Maze:
                     continue
                 value = maze_dict[ij]
                 if value == "#":
-                    if border is not Border.EMPTY:
-                        border = border | Border[direction]
-                    else:
-                        border = Border[direction]
+                    border |= BITS[direction]
                 elif value == "S":
                     role = Role.ENTRANCE
                 elif value == "E":
                     role = Role.EXIT
-            squares.append(Square(index, row, column, border, role))
+            squares.append(Square(index, row, column, BORDERS[border], role))
             index += 1
             column += 1
         row += 1
-    maze_new = Maze(tuple(squares))
+    maze_new = Maze.from_squares(squares)
     return maze_new
 
 
@@ -0,0 +1,239 @@
+# to keep cached graphs in order of last use
+from collections import OrderedDict
+# parent to data classes that are expected by only contain and modify their own data
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable
+
+import networkx as nx
+import numpy as np
+
+from src.graphs.components import label_components
+from src.graphs.converter import make_graph
+from src.graphs.distance_field import DistanceField
+from src.graphs.jump_points import JumpGrid
+from src.graphs.maze_graph import MazeGraph
+from src.graphs.pruning import fill_dead_ends
+from src.graphs.weight_model import WeightModel
+from src.models.maze import Maze
+
+# rough bytes networkx holds per edge and per node of a directed graph
+NETWORKX_EDGE_BYTES: int = 400
+NETWORKX_NODE_BYTES: int = 600
+
+
+@dataclass
+class GraphCache:
+    """
+    Dataclass of least recently used graphs, by key of maze digest and graph parameters
+    Evicts oldest graphs once more than max_items or max_bytes are held
+    Counts hits and misses
+    """
+    max_items: int = 32
+    max_bytes: int = 512 * 2**20
+    hits: int = 0
+    misses: int = 0
+    graphs: OrderedDict = field(default_factory=OrderedDict, repr=False)
+    nbytes: int = 0
+
+    def get(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """
+        Input key and function to build graph if key is not cached
+        Output is cached or newly built graph
+        :param key:
+        :param build:
+        :return: graph
+        """
+        if key in self.graphs:
+            self.hits += 1
+            self.graphs.move_to_end(key)
+            return self.graphs[key][0]
+        self.misses += 1
+        graph = build()
+        nbytes = get_nbytes(graph)
+        # graph that could never fit is returned without evicting everything else
+        if nbytes > self.max_bytes or self.max_items < 1:
+            return graph
+        self.graphs[key] = graph, nbytes
+        self.nbytes += nbytes
+        while len(self.graphs) > self.max_items or self.nbytes > self.max_bytes:
+            _, (_, evicted) = self.graphs.popitem(last=False)
+            self.nbytes -= evicted
+        return graph
+
+    def clear(self) -> None:
+        """
+        Removes every graph and resets counters
+        :return: None
+        """
+        self.graphs.clear()
+        self.nbytes = self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        """
+        Return number of cached graphs
+        :return: integer
+        """
+        return len(self.graphs)
+
+
+# cache shared by solver unless another one is passed
+GRAPH_CACHE = GraphCache()
+
+
+def get_nbytes(graph: MazeGraph | JumpGrid | DistanceField | Maze | np.ndarray | nx.DiGraph) -> int:
+    """
+    Input graph, jump grid, distance field, pruned maze, or component labels
+    Output is rough number of bytes graph holds
+    :param graph:
+    :return: integer
+    """
+    if isinstance(graph, (MazeGraph, JumpGrid, DistanceField, np.ndarray)):
+        return graph.nbytes
+    if isinstance(graph, Maze):
+        return len(graph.values)
+    return (
+        graph.number_of_edges() * NETWORKX_EDGE_BYTES
+        + graph.number_of_nodes() * NETWORKX_NODE_BYTES
+    )
+
+
+def get_maze_graph(
+    maze: Maze,
+    contract: bool = False,
+    bonus=1,
+    penalty=2,
+    cache: GraphCache = GRAPH_CACHE,
+) -> MazeGraph:
+    """
+    Input maze instance and graph parameters
+    Output is MazeGraph from cache, built only if maze was not seen with these parameters
+    :param maze:
+    :param contract:
+    :param bonus:
+    :param penalty:
+    :param cache:
+    :return: MazeGraph
+    """
+    return cache.get(
+        (maze.digest, "maze_graph", contract, bonus, penalty),
+        lambda: MazeGraph.from_maze(maze, contract, bonus, penalty),
+    )
+
+
+def get_weighted_graph(
+    maze: Maze,
+    model: WeightModel,
+    contract: bool = False,
+    cache: GraphCache = GRAPH_CACHE,
+) -> MazeGraph:
+    """
+    Input maze instance, weight model, and graph parameters
+    Output is MazeGraph weighed by model from cache, only reweighing edges of cached graph
+    of maze if maze was not seen with this model
+    :param maze:
+    :param model:
+    :param contract:
+    :param cache:
+    :return: MazeGraph
+    """
+    return cache.get(
+        (maze.digest, "weighted_graph", contract, model.key),
+        lambda: get_maze_graph(maze, contract, cache=cache).reweight(maze, model),
+    )
+
+
+def get_jump_grid(
+    maze: Maze,
+    bonus=1,
+    penalty=2,
+    cache: GraphCache = GRAPH_CACHE,
+) -> JumpGrid:
+    """
+    Input maze instance and weight options
+    Output is jump grid from cache, built only if maze was not seen with these parameters
+    :param maze:
+    :param bonus:
+    :param penalty:
+    :param cache:
+    :return: JumpGrid
+    """
+    return cache.get(
+        (maze.digest, "jump_grid", bonus, penalty),
+        lambda: JumpGrid.from_maze(
+            maze, get_maze_graph(maze, False, bonus, penalty, cache), bonus, penalty
+        ),
+    )
+
+
+def get_networkx_graph(
+    maze: Maze,
+    contract: bool = False,
+    bonus=1,
+    penalty=2,
+    cache: GraphCache = GRAPH_CACHE,
+) -> nx.DiGraph:
+    """
+    Input maze instance and graph parameters
+    Output is networkx graph from cache, built only if maze was not seen with these parameters
+    :param maze:
+    :param contract:
+    :param bonus:
+    :param penalty:
+    :param cache:
+    :return: nx.DiGraph
+    """
+    return cache.get(
+        (maze.digest, "networkx", contract, bonus, penalty),
+        lambda: make_graph(maze, contract, bonus, penalty),
+    )
+
+
+def get_distance_field(
+    maze: Maze,
+    targets: tuple[int, ...] | None = None,
+    bonus=1,
+    penalty=2,
+    cache: GraphCache = GRAPH_CACHE,
+) -> DistanceField:
+    """
+    Input maze instance, target square indices, exit if None, and weight options
+    Output is distance field towards targets from cache,
+    measured only if maze was not seen with these targets and parameters
+    Raises exception if any edge weighs less than zero
+    :param maze:
+    :param targets:
+    :param bonus:
+    :param penalty:
+    :param cache:
+    :return: DistanceField
+    """
+    targets = (maze.roles.ends[1],) if targets is None else tuple(sorted(set(targets)))
+    return cache.get(
+        (maze.digest, "distance_field", targets, bonus, penalty),
+        lambda: DistanceField.from_graph(
+            get_maze_graph(maze, False, bonus, penalty, cache), targets
+        ),
+    )
+
+
+def get_pruned_maze(maze: Maze, cache: GraphCache = GRAPH_CACHE) -> Maze:
+    """
+    Input maze instance
+    Output is maze with dead ends filled from cache, filled only if maze was not seen
+    :param maze:
+    :param cache:
+    :return: Maze
+    """
+    return cache.get((maze.digest, "pruned"), lambda: fill_dead_ends(maze))
+
+
+def get_components(maze: Maze, cache: GraphCache = GRAPH_CACHE) -> np.ndarray:
+    """
+    Input maze instance
+    Output is connected component label of every square from cache,
+    labelled only if maze was not seen, see components.label_components
+    :param maze:
+    :param cache:
+    :return: np.ndarray
+    """
+    return cache.get((maze.digest, "components"), lambda: label_components(maze))
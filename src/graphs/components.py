@@ -0,0 +1,33 @@
+# to label squares in vectorized sweeps over packed values
+import numpy as np
+
+from src.graphs.maze_graph import IS_NODE, get_grid_edges
+from src.models.maze import Maze
+
+
+def label_components(maze: Maze) -> np.ndarray:
+    """
+    Input maze instance.
+    Labels squares connected by edges of maze graph, without building the graph.
+    Every component is labelled by its smallest square index: each round, the label of
+    every component is lowered to the smallest label across any of its edges,
+    then every square is pointed straight at its component label, until no edge joins two labels.
+    Output is label of every square by square index, -1 for walls and exterior squares.
+    :param maze:
+    :return: np.ndarray
+    """
+    nodes = IS_NODE[maze.cells]
+    sources, targets, _ = get_grid_edges(maze, nodes)
+    labels = np.arange(len(nodes))
+    while True:
+        low = np.minimum(labels[sources], labels[targets])
+        high = np.maximum(labels[sources], labels[targets])
+        joined = low != high
+        if not joined.any():
+            break
+        # labels of squares are always labels of components, so this joins whole components
+        np.minimum.at(labels, high[joined], low[joined])
+        while not np.array_equal(roots := labels[labels], labels):
+            labels = roots
+    labels[~nodes] = -1
+    return labels
@@ -3,7 +3,7 @@ from typing import NamedTuple, TypeAlias
 
 import networkx as nx
 
-from src.models.border import Border
+from src.models.border_table import BOTTOM, RIGHT
 from src.models.maze import Maze
 from src.models.role import Role
 from src.models.square import Square
@@ -43,27 +43,47 @@ class Edge(NamedTuple):
         :param penalty:
         :return:
         """
-        match self.node2.role:
-            case Role.REWARD:
-                return self.distance - bonus
-            case Role.ENEMY:
-                return self.distance + penalty
-            case _:
-                return self.distance
+        return role_weight(self.distance, self.node2.role, bonus, penalty)
 
 
-def make_graph(maze: Maze) -> nx.DiGraph:
+def role_weight(distance: float, role: Role, bonus=1, penalty=2) -> float:
+    """
+    Based on role of node an edge leads to
+    Alters and returns new distance measurement
+    :param distance:
+    :param role:
+    :param bonus:
+    :param penalty:
+    :return: float
+    """
+    match role:
+        case Role.REWARD:
+            return distance - bonus
+        case Role.ENEMY:
+            return distance + penalty
+        case _:
+            return distance
+
+
+def make_graph(
+    maze: Maze, contract: bool = False, bonus=1, penalty=2
+) -> nx.DiGraph:
     """
     Input a maze instance.
     Create available nodes then edges from maze.
     Generate a tuple containing tuples of edges containing node1, node2, and edge weight.
     Create graph from tuple and return.
+    If contract, straight corridors are collapsed into weighted edges between decision points,
+    use expand_path to turn a path of that graph back into every square.
     :param maze:
+    :param contract:
+    :param bonus:
+    :param penalty:
     :return:
     """
     return nx.DiGraph(
-        (edge.node1, edge.node2, {"weight": edge.weight()})
-        for edge in get_directed_edges(maze, get_nodes(maze))
+        (edge.node1, edge.node2, {"weight": edge.weight(bonus, penalty)})
+        for edge in get_directed_edges(maze, get_nodes(maze, contract))
     )
 
 # def make_graph(maze: Maze) -> nx.DiGraph:
@@ -112,34 +132,75 @@ def get_directed_edges(maze: Maze, nodes: set[Node]) -> set[Edge]:
 #     return directed_edges
 
 
-def get_nodes(maze: Maze) -> set[Node]:
+def get_nodes(maze: Maze, contract: bool = False) -> set[Node]:
     """
     Input maze instance.
     Add squares that are corridors, intersections, corners, dead-ends, entrances, or exits to set.
+    If contract, leave out straight corridors so only decision points are nodes.
     Output set of nodes.
     :param maze:
+    :param contract:
     :return: set[Node]
     """
     nodes: set[Node] = set()
-    for square in maze:
-        # don't add exterior or wall squares
-        if square.role in (Role.EXTERIOR, Role.WALL):
+    for index, value in enumerate(maze.values):
+        # don't add exterior or wall squares, checked on the packed value before creating a square
+        if value >> 4 in (Role.EXTERIOR, Role.WALL):
+            continue
+        if contract and not is_decision_point(maze, index):
             continue
-        # add every square with a role other than None, Exterior, or Wall
-        # if square.role is not Role.NONE:
-        #     nodes.add(square)
-        # # add squares with intersection, dead-end, and corner borders
-        # # remember sets cannot have duplicates, so it won't matter if it has already been added
-        # if (
-        #     square.border.intersection
-        #     or square.border.dead_end
-        #     or square.border.corner
-        # ):
-        nodes.add(square)
+        nodes.add(maze[index])
     # return set of nodes/squares
     return nodes
 
 
+def is_decision_point(maze: Maze, index: int) -> bool:
+    """
+    Input maze instance and square index.
+    Squares with a role other than None, intersections, dead-ends, and corners are decision points,
+    every other square is part of a straight corridor.
+    Sides are open the way get_edges traverses them, by the border of the square being left,
+    so a square is entered from the left or from above past the border of its neighbor.
+    :param maze:
+    :param index:
+    :return: boolean
+    """
+    value = maze.values[index]
+    # add every square with a role other than None, Exterior, or Wall
+    if value >> 4 != Role.NONE:
+        return True
+    row, column = divmod(index, maze.width)
+    left = column > 0 and not maze.values[index - 1] & RIGHT
+    right = column < maze.width - 1 and not value & RIGHT
+    up = row > 0 and not maze.values[index - maze.width] & BOTTOM
+    down = row < maze.height - 1 and not value & BOTTOM
+    # add every square that isn't open on both sides of only its row or only its column
+    return (left, right, up, down) not in ((True, True, False, False), (False, False, True, True))
+
+
+def expand_path(maze: Maze, path: list[int]) -> list[int]:
+    """
+    Input maze instance and square indices of a path between nodes of a contracted graph.
+    Fill in squares of straight corridors between consecutive nodes,
+    leaving out exterior and wall squares the same way get_edges jumps over them.
+    Output list of square indices of every square along path.
+    :param maze:
+    :param path:
+    :return: list[int]
+    """
+    expanded = path[:1]
+    for source, target in zip(path, path[1:]):
+        # nodes share a row or a column, step along it one square at a time
+        step = 1 if source // maze.width == target // maze.width else maze.width
+        step = step if target > source else -step
+        expanded.extend(
+            index
+            for index in range(source + step, target + step, step)
+            if maze.values[index] >> 4 not in (Role.EXTERIOR, Role.WALL)
+        )
+    return expanded
+
+
 def get_edges(maze: Maze, nodes: set[Node]) -> set[Edge]:
     """
     Input maze instance and set of nodes.
@@ -150,33 +211,35 @@ def get_edges(maze: Maze, nodes: set[Node]) -> set[Edge]:
     :return: set[Edge]
     """
     edges: set[Edge] = set()
+    # look up nodes by index so traversal can read borders from the packed values
+    nodes_by_index = {node.index: node for node in nodes}
     for source_node in nodes:
         # traverse right
-        node = source_node
+        index = source_node.index
         # start traverse one column right of current
-        for x in range(node.column + 1, maze.width):
-            # if current node has right border, break
-            if node.border & Border.RIGHT:
+        for _ in range(source_node.column + 1, maze.width):
+            # if current square has right border, break
+            if maze.values[index] & RIGHT:
                 break
-            # reassign right adjacent node to current node
-            node = maze.squares[node.row * maze.width + x]
-            # if new current node is already in set of nodes
+            # move to right adjacent square
+            index += 1
+            # if new current square is already in set of nodes
             # create new edge, add to edge set, and break
-            if node in nodes:
+            if (node := nodes_by_index.get(index)) is not None:
                 edges.add(Edge(source_node, node))
                 break
         # traverse down
-        node = source_node
+        index = source_node.index
         # start traverse one row below current
-        for y in range(node.row + 1, maze.height):
-            # if current node has bottom border, break
-            if node.border & Border.BOTTOM:
+        for _ in range(source_node.row + 1, maze.height):
+            # if current square has bottom border, break
+            if maze.values[index] & BOTTOM:
                 break
-            # reassign bottom adjacent border to current
-            node = maze.squares[y * maze.width + node.column]
-            # if new current node is already in set of nodes
+            # move to bottom adjacent square
+            index += maze.width
+            # if new current square is already in set of nodes
             # create new edge, add to edge set, and break
-            if node in nodes:
+            if (node := nodes_by_index.get(index)) is not None:
                 edges.add(Edge(source_node, node))
                 break
     return edges
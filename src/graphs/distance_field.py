@@ -0,0 +1,96 @@
+# parent to data classes that are expected by only contain and modify their own data
+from dataclasses import dataclass
+# to keep frontier of search ordered by distance
+import heapq
+import math
+
+import numpy as np
+
+from src.graphs.maze_graph import MazeGraph
+from src.graphs.search import check_weights
+
+
+@dataclass(frozen=True, eq=False)
+class DistanceField:
+    """
+    Immutable dataclass of distance from every square to the closest of some target squares
+    Each square also keeps the next square along a shortest path towards targets,
+    so a path from any square is followed in steps instead of searched
+    Squares that can't reach any target are infinitely far and have no next square
+    """
+    targets: tuple[int, ...]
+    distances: np.ndarray
+    successors: np.ndarray
+
+    @classmethod
+    def from_graph(cls, graph: MazeGraph, targets: tuple[int, ...]) -> "DistanceField":
+        """
+        Input maze graph and target square indices.
+        Searches once with Dijkstra's algorithm from all targets at the same time,
+        walking edges backwards, so distances are of paths towards targets.
+        Raises exception if any edge weighs less than zero.
+        :param graph:
+        :param targets:
+        :return: DistanceField
+        """
+        if check_weights(graph):
+            raise ValueError("Distance fields need edges that weigh zero or more")
+        offsets, neighbors, _ = graph.adjacency
+        # edge from a square towards one closer to targets is the reverse of the edge walked
+        weights = graph.reverse_weights
+        distances = [math.inf] * graph.size
+        successors = [-1] * graph.size
+        frontier = []
+        for target in targets:
+            distances[target] = 0
+            frontier.append((0, target))
+        heapq.heapify(frontier)
+        while frontier:
+            distance, index = heapq.heappop(frontier)
+            # skip stale frontier entries that were improved after being pushed
+            if distance > distances[index]:
+                continue
+            for edge in range(offsets[index], offsets[index + 1]):
+                neighbor = neighbors[edge]
+                if (candidate := distance + weights[edge]) < distances[neighbor]:
+                    distances[neighbor] = candidate
+                    successors[neighbor] = index
+                    heapq.heappush(frontier, (candidate, neighbor))
+        return cls(
+            tuple(targets),
+            np.array(distances),
+            np.array(successors, dtype=np.int32),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns number of bytes field holds
+        :return: integer
+        """
+        return self.distances.nbytes + self.successors.nbytes
+
+    def distance(self, index: int) -> float:
+        """
+        Input square index
+        Output is weight of shortest path from square to closest target, infinite if none
+        :param index:
+        :return: float
+        """
+        return float(self.distances[index])
+
+    def path(self, index: int) -> list[int] | None:
+        """
+        Input square index
+        Follows next square from square until a target, one step per square of path
+        Output is list of square indices from square to target or None if unreachable
+        :param index:
+        :return: list[int] | None
+        """
+        if not math.isfinite(self.distances[index]):
+            return None
+        successors = self.successors
+        path = [index]
+        while (following := int(successors[path[-1]])) != -1:
+            path.append(following)
+        return path
@@ -0,0 +1,249 @@
+# parent to data classes that are expected by only contain and modify their own data
+from dataclasses import dataclass, field
+# to keep frontier of search ordered by distance
+import heapq
+import math
+from typing import Iterable
+
+from src.graphs.converter import role_weight
+from src.graphs.maze_graph import IS_NODE, MazeGraph
+from src.models.border_table import BOTTOM, RIGHT
+from src.models.maze import Maze
+from src.models.role import Role
+from src.models.square import Square
+from src.persistence.serializer import compress
+
+# whether packed square value is a node, as a list to read one value at a time
+NODES: list[bool] = IS_NODE.tolist()
+# distance of squares not reached, distances are pairs of weight and number of edges
+UNREACHED: tuple[float, int] = (math.inf, 0)
+
+
+@dataclass
+class IncrementalSolver:
+    """
+    Dataclass of a maze being edited and the state of its last search, kept between solves
+    Search is Lifelong Planning A* without an estimate, an incremental Dijkstra's algorithm,
+    so after squares change only squares whose distance from entrance changed are searched again
+    Edges are kept per square as a map of neighbor index to weight, in both directions
+    Distances count edges after weight, so edges that weigh zero, like between neighboring rewards,
+    still make a path longer and squares joined by them can't hold up each other's old distance
+    """
+    width: int
+    height: int
+    values: bytearray
+    bonus: float = 1
+    penalty: float = 2
+    source: int = -1
+    target: int = -1
+    edges: dict[int, dict[int, float]] = field(default_factory=dict, repr=False)
+    # distance of each square as of last search, and as its neighbors tell it should be now
+    distances: dict[int, tuple[float, int]] = field(default_factory=dict, repr=False)
+    expected: dict[int, tuple[float, int]] = field(default_factory=dict, repr=False)
+    # squares whose two distances differ, by key they were last pushed with
+    frontier: list[tuple[tuple[float, int], int]] = field(default_factory=list, repr=False)
+    queued: dict[int, tuple[float, int]] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_maze(cls, maze: Maze, bonus=1, penalty=2) -> "IncrementalSolver":
+        """
+        Input maze instance and weight options
+        Output is incremental solver of a copy of maze, nothing is searched until solve
+        :param maze:
+        :param bonus:
+        :param penalty:
+        :return: IncrementalSolver
+        """
+        graph = MazeGraph.from_maze(maze, bonus=bonus, penalty=penalty)
+        offsets, targets, weights = graph.adjacency
+        edges = {
+            index: dict(zip(targets[start:end], weights[start:end]))
+            for index, (start, end) in enumerate(zip(offsets, offsets[1:]))
+            if start != end
+        }
+        solver = cls(maze.width, maze.height, bytearray(maze.values), bonus, penalty, edges=edges)
+        solver.reset(*maze.roles.ends)
+        return solver
+
+    @property
+    def maze(self) -> Maze:
+        """
+        Returns maze as edited so far
+        :return: Maze
+        """
+        return Maze(self.width, self.height, bytes(self.values), trusted=True)
+
+    def reset(self, source: int, target: int) -> None:
+        """
+        Input entrance and exit square indices
+        Forgets every distance, the next solve searches from scratch
+        :param source:
+        :param target:
+        :return: None
+        """
+        self.source, self.target = source, target
+        self.distances.clear()
+        self.expected = {source: (0, 0)}
+        self.frontier = [((0, 0), source)]
+        self.queued = {source: (0, 0)}
+
+    def update(self, squares: Iterable[Square]) -> None:
+        """
+        Input edited squares, replacing squares of same index
+        Edges change only along the rows and columns of edited squares,
+        and only squares those edges lead into are queued to be searched again
+        Moving entrance or exit starts the next search from scratch
+        Raises exception if edited maze is not valid
+        :param squares:
+        :return: None
+        """
+        changes = {square.index: compress(square) for square in squares}
+        source, target = self.source, self.target
+        if any(
+            Role.ENTRANCE in roles or Role.EXIT in roles
+            for roles in ((self.values[index] >> 4, value >> 4) for index, value in changes.items())
+        ):
+            # validate before editing, entrance or exit may have moved
+            edited = bytearray(self.values)
+            for index, value in changes.items():
+                edited[index] = value
+            roles = Maze(self.width, self.height, bytes(edited)).roles
+            source, target = roles.ends
+        lines = [
+            (range(row * self.width, (row + 1) * self.width), RIGHT)
+            for row in {index // self.width for index in changes}
+        ] + [
+            (range(column, self.width * self.height, self.width), BOTTOM)
+            for column in {index % self.width for index in changes}
+        ]
+        before = [self.get_line_edges(line, border) for line, border in lines]
+        for index, value in changes.items():
+            self.values[index] = value
+        after = [self.get_line_edges(line, border) for line, border in lines]
+        changed = set()
+        for old, new in zip(before, after):
+            for edge in old.keys() - new.keys():
+                del self.edges[edge[0]][edge[1]]
+                changed.add(edge[1])
+            for edge, weight in new.items():
+                if old.get(edge) != weight:
+                    self.edges.setdefault(edge[0], {})[edge[1]] = weight
+                    changed.add(edge[1])
+        if (source, target) != (self.source, self.target):
+            self.reset(source, target)
+            return
+        for index in changed:
+            self.update_square(index)
+
+    def get_line_edges(self, line: range, border: int) -> dict[tuple[int, int], float]:
+        """
+        Input square indices of a row or column and border towards next square along it
+        Same as converter.get_edges, every node connects to the next node before a border
+        Output is weight of edges between nodes of line by pair of square indices,
+        in both directions
+        :param line:
+        :param border:
+        :return: dict[tuple[int, int], float]
+        """
+        edges = {}
+        previous = None
+        for position, index in enumerate(line):
+            value = self.values[index]
+            if NODES[value]:
+                if previous is not None:
+                    # weight of each direction depends on role of square it enters
+                    other, distance = previous[0], position - previous[1]
+                    edges[other, index] = self.get_weight(distance, index)
+                    edges[index, other] = self.get_weight(distance, other)
+                previous = index, position
+            if value & border:
+                previous = None
+        return edges
+
+    def get_weight(self, distance: int, index: int) -> float:
+        """
+        Input number of squares along an edge and square index edge enters
+        Output is weight of edge, see converter.role_weight
+        :param distance:
+        :param index:
+        :return: float
+        """
+        return role_weight(distance, Role(self.values[index] >> 4), self.bonus, self.penalty)
+
+    def update_square(self, index: int) -> None:
+        """
+        Input square index
+        Recalculates distance square should have from its neighbors,
+        and queues square to be searched if that differs from its distance
+        :param index:
+        :return: None
+        """
+        distances, edges = self.distances, self.edges
+        if index != self.source:
+            expected = UNREACHED
+            for neighbor in edges.get(index, {}):
+                weight, steps = distances.get(neighbor, UNREACHED)
+                if (candidate := (weight + edges[neighbor][index], steps + 1)) < expected:
+                    expected = candidate
+            self.expected[index] = expected
+        distance = distances.get(index, UNREACHED)
+        expected = self.expected.get(index, UNREACHED)
+        if distance != expected:
+            self.queued[index] = key = min(distance, expected)
+            heapq.heappush(self.frontier, (key, index))
+        else:
+            self.queued.pop(index, None)
+
+    def solve(self) -> list[int] | None:
+        """
+        Searches again only squares queued since last solve
+        Output is list of square indices from entrance to exit or None if unreachable
+        :return: list[int] | None
+        """
+        distances, expected, frontier, queued = (
+            self.distances, self.expected, self.frontier, self.queued
+        )
+        target = self.target
+        while frontier:
+            key, index = frontier[0]
+            # skip stale frontier entries that were queued again or are no longer queued
+            if queued.get(index) != key:
+                heapq.heappop(frontier)
+                continue
+            # stop once exit is settled and nothing queued could lead to it any shorter
+            goal = distances.get(target, UNREACHED)
+            if goal == expected.get(target, UNREACHED) and key >= goal:
+                break
+            heapq.heappop(frontier)
+            del queued[index]
+            if distances.get(index, UNREACHED) > expected[index]:
+                distances[index] = expected[index]
+            else:
+                # distance went up, forget it and let neighbors tell it again
+                distances[index] = UNREACHED
+                self.update_square(index)
+            for neighbor in self.edges.get(index, {}):
+                self.update_square(neighbor)
+        if distances.get(target, UNREACHED) == UNREACHED:
+            return None
+        return self.get_path()
+
+    def get_path(self) -> list[int]:
+        """
+        Walks back from exit along edges with no slack, that shortest paths are made of
+        Output is list of square indices from entrance to exit
+        :return: list[int]
+        """
+        distances, edges = self.distances, self.edges
+        path = [self.target]
+        while path[-1] != self.source:
+            index = path[-1]
+            path.append(next(
+                neighbor
+                for neighbor, (weight, steps) in (
+                    (neighbor, distances.get(neighbor, UNREACHED)) for neighbor in edges[index]
+                )
+                if (weight + edges[neighbor][index], steps + 1) == distances[index]
+            ))
+        path.reverse()
+        return path
@@ -0,0 +1,199 @@
+# parent to data classes that are expected by only contain and modify their own data
+from dataclasses import dataclass
+# to keep frontier of search ordered by distance
+import heapq
+import math
+
+# to find steps between neighboring squares in vectorized sweeps over packed values
+import numpy as np
+
+from src.graphs.maze_graph import IS_NODE, LIST_ITEM_BYTES, MazeGraph
+from src.graphs.search import Heuristic, get_estimate, get_path, manhattan
+from src.graphs.weight_model import get_role_costs
+from src.models.border import Border
+from src.models.maze import Maze
+from src.models.role import Role
+
+# directions of steps, horizontal directions are odd
+UP, LEFT, DOWN, RIGHT = range(4)
+OPPOSITE = (DOWN, RIGHT, UP, LEFT)
+
+
+@dataclass(frozen=True, eq=False)
+class JumpGrid:
+    """
+    Immutable dataclass of steps between neighboring squares of a maze, for jump point search
+    steps[direction][index] is the square one step from square index in direction,
+    -1 if a border is in the way or either square is not a node
+    Regular squares have no role and only edges of one step, jumps only pass over them,
+    costs are what stepping into each square weighs
+    """
+    steps: tuple[list[int], list[int], list[int], list[int]]
+    regular: list[bool]
+    costs: list[float]
+
+    @classmethod
+    def from_maze(cls, maze: Maze, graph: MazeGraph, bonus=1, penalty=2) -> "JumpGrid":
+        """
+        Input maze instance, its maze graph, and weight options used to build the graph.
+        :param maze:
+        :param graph:
+        :param bonus:
+        :param penalty:
+        :return: JumpGrid
+        """
+        cells = maze.cells
+        size = len(cells)
+        indices = np.arange(size)
+        nodes = IS_NODE[cells]
+        # a step right and the step back left share the border of the left square
+        right = np.full(size, -1)
+        open_right = nodes[:-1] & nodes[1:] & (cells[:-1] & Border.RIGHT == 0)
+        open_right &= indices[:-1] % maze.width != maze.width - 1
+        right[:-1][open_right] = indices[1:][open_right]
+        left = np.full(size, -1)
+        left[1:][open_right] = indices[:-1][open_right]
+        # a step down and the step back up share the border of the upper square
+        width = maze.width
+        down = np.full(size, -1)
+        open_down = nodes[:-width] & nodes[width:] & (cells[:-width] & Border.BOTTOM == 0)
+        down[:-width][open_down] = indices[width:][open_down]
+        up = np.full(size, -1)
+        up[width:][open_down] = indices[:-width][open_down]
+        steps = (up, left, down, right)
+        # every edge of a regular square is a step
+        degrees = np.diff(graph.offsets)
+        regular = nodes & (cells >> 4 == Role.NONE)
+        regular &= degrees == sum((step != -1).astype(int) for step in steps)
+        costs = 1 + get_role_costs(bonus, penalty)[cells >> 4]
+        return cls(
+            tuple(step.tolist() for step in steps),
+            regular.tolist(),
+            costs.tolist(),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns rough number of bytes grid holds
+        :return: integer
+        """
+        return (len(self.steps) + 2) * len(self.regular) * LIST_ITEM_BYTES
+
+    def is_forced(self, previous: int, index: int, direction: int, turn: int) -> bool:
+        """
+        Input square stepped from, square stepped into, direction of step, and direction to turn
+        A turn is forced if it can't be made one square earlier at the same cost,
+        otherwise paths that turn earlier are searched instead
+        :param previous:
+        :param index:
+        :param direction:
+        :param turn:
+        :return: boolean
+        """
+        if (turned := self.steps[turn][index]) == -1:
+            return False
+        side = self.steps[turn][previous]
+        return side == -1 or not self.regular[side] or self.steps[direction][side] != turned
+
+    def jump(self, index: int, direction: int, target: int) -> tuple[int, int] | None:
+        """
+        Input square index, direction, and target square index
+        Steps in direction until target, a square that is not regular, or a square to turn at,
+        paths move vertically before horizontally, so moving vertically every square
+        a horizontal jump leads on from is a square to turn at
+        Output is square jumped to and number of steps, None if jump leads nowhere
+        :param index:
+        :param direction:
+        :param target:
+        :return: tuple[int, int] | None
+        """
+        step = self.steps[direction]
+        previous, current, count = index, step[index], 1
+        while current != -1:
+            if current == target or not self.regular[current]:
+                return current, count
+            if direction in (LEFT, RIGHT):
+                if self.is_forced(previous, current, direction, UP) or self.is_forced(
+                    previous, current, direction, DOWN
+                ):
+                    return current, count
+            elif any(
+                self.steps[turn][current] != -1 and self.jump(current, turn, target) is not None
+                for turn in (LEFT, RIGHT)
+            ):
+                return current, count
+            previous, current, count = current, step[current], count + 1
+        return None
+
+    def get_directions(self, index: int, direction: int | None) -> tuple[int, ...]:
+        """
+        Input regular square index and direction of jump into it, None if search starts there
+        Output is directions to jump on from square
+        :param index:
+        :param direction:
+        :return: tuple[int, ...]
+        """
+        if direction is None:
+            return UP, LEFT, DOWN, RIGHT
+        if direction in (UP, DOWN):
+            return direction, LEFT, RIGHT
+        previous = self.steps[OPPOSITE[direction]][index]
+        return (direction,) + tuple(
+            turn for turn in (UP, DOWN) if self.is_forced(previous, index, direction, turn)
+        )
+
+
+def jump_search(
+    graph: MazeGraph,
+    grid: JumpGrid,
+    source: int,
+    target: int,
+    heuristic: Heuristic = manhattan,
+) -> list[int] | None:
+    """
+    Input maze graph, its jump grid, source and target square indices, and heuristic.
+    Search shortest path with A* over jump points, jumping along rows and columns
+    of regular squares instead of adding each of them to the frontier.
+    Squares that are not regular, and squares next to them, are expanded by every edge.
+    Output is list of jump point indices from source to target, in straight lines,
+    see converter.expand_path, or None if unreachable.
+    :param graph:
+    :param grid:
+    :param source:
+    :param target:
+    :param heuristic:
+    :return: list[int] | None
+    """
+    offsets, targets, weights = graph.adjacency
+    discount = graph.discount
+    distances: dict[int, float] = {source: 0}
+    previous: dict[int, int] = {}
+    # direction each square was jumped into, None to expand every direction
+    frontier = [(get_estimate(graph, heuristic, source, target, discount), 0, source, None)]
+    while frontier:
+        _, distance, index, direction = heapq.heappop(frontier)
+        if index == target:
+            return get_path(previous, target)
+        # skip stale frontier entries that were improved after being pushed
+        if distance > distances[index]:
+            continue
+        if not grid.regular[index]:
+            successors = (
+                (targets[edge], weights[edge], None)
+                for edge in range(offsets[index], offsets[index + 1])
+            )
+        else:
+            successors = (
+                (jumped, count - 1 + grid.costs[jumped], following)
+                for following in grid.get_directions(index, direction)
+                if (found := grid.jump(index, following, target)) is not None
+                for jumped, count in (found,)
+            )
+        for neighbor, weight, following in successors:
+            if (candidate := distance + weight) < distances.get(neighbor, math.inf):
+                distances[neighbor] = candidate
+                previous[neighbor] = index
+                estimate = get_estimate(graph, heuristic, neighbor, target, discount)
+                heapq.heappush(frontier, (candidate + estimate, candidate, neighbor, following))
+    return None
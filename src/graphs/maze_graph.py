@@ -0,0 +1,284 @@
+# parent to data classes that are expected by only contain and modify their own data
+from dataclasses import dataclass, replace
+# to cache method results to avoid recalculations when recalled
+from functools import cached_property
+# type hints for iterator
+from typing import Iterator
+
+import networkx as nx
+# to build adjacency in vectorized sweeps over packed values
+import numpy as np
+
+from src.graphs.weight_model import WeightModel
+from src.models.border import Border
+from src.models.maze import Maze
+from src.models.role import Role
+
+# rough bytes of one item of a list made by tolist, pointer and int or float object
+LIST_ITEM_BYTES: int = 36
+
+# lookup table from packed square value to whether square is a node
+IS_NODE = np.array([value >> 4 not in (Role.EXTERIOR, Role.WALL) for value in range(256)])
+
+
+@dataclass(frozen=True, eq=False)
+class MazeGraph:
+    """
+    Immutable dataclass of maze graph as compressed sparse rows over square indices
+    Edges leaving square i are targets[offsets[i]:offsets[i + 1]],
+    with the number of squares along each edge in distances and its cost in weights
+    Squares that are not nodes have no edges
+    """
+    width: int
+    height: int
+    offsets: np.ndarray
+    targets: np.ndarray
+    distances: np.ndarray
+    weights: np.ndarray
+
+    @classmethod
+    def from_maze(
+        cls, maze: Maze, contract: bool = False, bonus=1, penalty=2
+    ) -> "MazeGraph":
+        """
+        Input maze instance.
+        Builds the same edges and weights converter.make_graph does, straight from packed values.
+        If contract, only decision points are nodes, see converter.expand_path.
+        :param maze:
+        :param contract:
+        :param bonus:
+        :param penalty:
+        :return: MazeGraph
+        """
+        cells = maze.cells
+        size = len(cells)
+        nodes = get_decision_points(maze) if contract else IS_NODE[cells]
+        sources, targets, distances = get_grid_edges(maze, nodes)
+        # combine forward and reverse edges, then group edges by source
+        sources, targets = np.concatenate((sources, targets)), np.concatenate((targets, sources))
+        distances = np.concatenate((distances, distances))
+        order = np.argsort(sources, kind="stable")
+        offsets = np.zeros(size + 1, dtype=np.int32)
+        np.cumsum(np.bincount(sources, minlength=size), out=offsets[1:])
+        targets = targets[order].astype(np.int32)
+        distances = distances[order].astype(np.int32)
+        # cost of entering every role, looked up by role of each square edges enter
+        weights = WeightModel.from_options(bonus, penalty).apply(
+            maze, sources[order], targets, distances
+        )
+        return cls(maze.width, maze.height, offsets, targets, distances, weights)
+
+    def reweight(self, maze: Maze, model: WeightModel) -> "MazeGraph":
+        """
+        Input maze instance graph was built from and weight model.
+        Edges are kept as they are, only weights are looked up again.
+        Output is MazeGraph sharing edges with this one, weighed by model.
+        :param maze:
+        :param model:
+        :return: MazeGraph
+        """
+        weights = model.apply(maze, self.sources, self.targets, self.distances)
+        graph = replace(self, weights=weights)
+        if "adjacency" in self.__dict__:
+            # lists of edges are the same too, only list of weights is new
+            offsets, targets, _ = self.adjacency
+            graph.__dict__["adjacency"] = offsets, targets, graph.weights.tolist()
+        return graph
+
+    @property
+    def size(self) -> int:
+        """
+        Returns number of squares graph is over
+        :return: integer
+        """
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns rough number of bytes graph holds, counting lists searches read from
+        :return: integer
+        """
+        arrays = (self.offsets, self.targets, self.distances, self.weights)
+        items = len(self.offsets) + 2 * len(self.targets)
+        return sum(array.nbytes for array in arrays) + items * LIST_ITEM_BYTES
+
+    @cached_property
+    def sources(self) -> np.ndarray:
+        """
+        Returns source square index of every edge, in the same order as targets
+        :return: np.ndarray
+        """
+        return np.repeat(np.arange(self.size), np.diff(self.offsets))
+
+    @cached_property
+    def adjacency(self) -> tuple[list[int], list[int], list[float]]:
+        """
+        Returns offsets, targets, and weights as lists
+        Reading a list is much faster than reading a numpy array one item at a time
+        :return: tuple[list[int], list[int], list[float]]
+        """
+        return self.offsets.tolist(), self.targets.tolist(), self.weights.tolist()
+
+    @cached_property
+    def reverse_weights(self) -> list[float]:
+        """
+        Returns weight of the reverse of every edge, in the same order as targets
+        Weight depends on role of the square an edge enters, so an edge into a reward
+        weighs less than the edge back out of it, searches walking edges backwards read these
+        :return: list[float]
+        """
+        sources = np.repeat(np.arange(self.size), np.diff(self.offsets))
+        # cost of entering each square, every edge into a square has the same cost
+        costs = np.zeros(self.size, dtype=np.float32)
+        costs[self.targets] = self.weights - self.distances
+        return (self.distances + costs[sources]).tolist()
+
+    @cached_property
+    def discount(self) -> float:
+        """
+        Returns most any path through graph can weigh less than its distance
+        A shortest path enters every square at most once,
+        so this is the largest reduction on any edge into each square, summed
+        :return: float
+        """
+        reduction = np.maximum(self.distances - self.weights, 0)
+        largest = np.zeros(self.size)
+        np.maximum.at(largest, self.targets, reduction)
+        return float(largest.sum())
+
+    @cached_property
+    def negative_edges(self) -> bool:
+        """
+        Returns whether any edge weighs less than zero, like an edge into a reward
+        with a bonus larger than its distance, then only some searches are exact
+        :return: boolean
+        """
+        return bool((self.weights < 0).any())
+
+    @cached_property
+    def negative_cycle(self) -> bool:
+        """
+        Returns whether a cycle weighs less than zero, then paths are endlessly shorter
+        A cycle enters each of its squares once either way round, so it weighs the same both ways,
+        half the sum of its edges and their reverses, and is below zero only if one such pair is
+        :return: boolean
+        """
+        return self.negative_edges and bool(
+            (self.weights + np.array(self.reverse_weights) < 0).any()
+        )
+
+    def neighbors(self, index: int) -> Iterator[tuple[int, float]]:
+        """
+        Input square index.
+        Output is iterator of neighbor index and edge weight pairs.
+        :param index:
+        :return: iterator
+        """
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return zip(self.targets[start:end].tolist(), self.weights[start:end].tolist())
+
+    def to_networkx(self) -> nx.DiGraph:
+        """
+        Output is networkx graph with square indices as nodes and weight edge attributes
+        :return: nx.DiGraph
+        """
+        sources = np.repeat(np.arange(self.size), np.diff(self.offsets))
+        graph = nx.DiGraph()
+        graph.add_weighted_edges_from(
+            zip(sources.tolist(), self.targets.tolist(), self.weights.tolist())
+        )
+        return graph
+
+    def to_scipy(self):
+        """
+        Output is scipy sparse matrix of edge weights, rows are sources and columns targets
+        Requires scipy to be installed
+        Edges that weigh zero are stored explicitly
+        :return: scipy.sparse.csr_array
+        """
+        # scipy is only needed for this export
+        from scipy.sparse import csr_array
+
+        return csr_array(
+            (self.weights, self.targets, self.offsets), shape=(self.size, self.size)
+        )
+
+
+def get_decision_points(maze: Maze) -> np.ndarray:
+    """
+    Input maze instance.
+    Same as converter.is_decision_point, for every square at once.
+    Output is whether each square is a node of a contracted graph, by square index.
+    :param maze:
+    :return: np.ndarray
+    """
+    cells = maze.cells.reshape(maze.height, maze.width)
+    # sides are open by the border of the square being left, towards right or down
+    right = (cells & Border.RIGHT) == 0
+    right[:, -1] = False
+    left = np.zeros_like(right)
+    left[:, 1:] = right[:, :-1]
+    down = (cells & Border.BOTTOM) == 0
+    down[-1] = False
+    up = np.zeros_like(down)
+    up[1:] = down[:-1]
+    straight = (left & right & ~up & ~down) | (up & down & ~left & ~right)
+    return (IS_NODE[cells] & ((cells >> 4 != Role.NONE) | ~straight)).ravel()
+
+
+def get_grid_edges(
+    maze: Maze, nodes: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Input maze instance and node flags by square index.
+    Traverses every row, then every column, same as converter.get_edges.
+    Output is source indices, target indices, and number of squares between them,
+    of edges right or down only.
+    :param maze:
+    :param nodes:
+    :return: tuple[np.ndarray, np.ndarray, np.ndarray]
+    """
+    cells = maze.cells
+    # traverse rows, squares in index order
+    across = np.arange(len(cells))
+    sources1, targets1, distances1 = get_edges(
+        across, nodes, (cells & Border.RIGHT) != 0, across % maze.width == 0
+    )
+    # traverse columns, squares in column by column order
+    down = across.reshape(maze.height, maze.width).T.ravel()
+    sources2, targets2, distances2 = get_edges(
+        down, nodes, (cells[down] & Border.BOTTOM) != 0, across % maze.height == 0
+    )
+    return (
+        np.concatenate((sources1, sources2)),
+        np.concatenate((targets1, targets2)),
+        np.concatenate((distances1, distances2)),
+    )
+
+
+def get_edges(
+    order: np.ndarray, nodes: np.ndarray, blocked: np.ndarray, first: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Input square indices in order of traversal, node flags by square index,
+    and by position of traversal whether square has a border towards the next one
+    and whether square starts a new row or column.
+    Same as converter.get_edges, every node connects to the next node of its run of open squares.
+    Output is source indices, target indices, and number of squares between them.
+    :param order:
+    :param nodes:
+    :param blocked:
+    :param first:
+    :return: tuple[np.ndarray, np.ndarray, np.ndarray]
+    """
+    # run of open squares starts at each new row or column and after every border
+    starts = first.copy()
+    starts[1:] |= blocked[:-1]
+    runs = np.cumsum(starts)
+    # positions of nodes in order of traversal, connect neighbors within the same run
+    positions = np.flatnonzero(nodes[order])
+    same_run = runs[positions[:-1]] == runs[positions[1:]]
+    sources = positions[:-1][same_run]
+    targets = positions[1:][same_run]
+    return order[sources], order[targets], targets - sources
@@ -0,0 +1,67 @@
+# to fill dead ends in vectorized sweeps over packed values
+import numpy as np
+
+from src.graphs.maze_graph import IS_NODE, MazeGraph
+from src.models.border import Border
+from src.models.maze import Maze
+from src.models.role import Role
+
+# lookup table from packed square value to whether square is never filled
+IS_PROTECTED = np.isin(np.arange(256) >> 4, [Role.ENTRANCE, Role.EXIT, Role.REWARD])
+# packed value of a filled square, a wall closed on every side
+FILLED: int = Role.WALL << 4 | Border.TOP | Border.LEFT | Border.BOTTOM | Border.RIGHT
+
+
+def fill_dead_ends(maze: Maze) -> Maze:
+    """
+    Input maze instance.
+    Fills every square that is a dead end, one with at most one edge,
+    then every square that became a dead end, until none are left.
+    Entrance, exit, and rewards are never filled, so every path between them is kept,
+    and in a perfect maze only the squares of the solution and paths to rewards remain.
+    Dead ends are counted by edges of maze graph rather than by Border.dead_end,
+    so edges that jump over walls count too.
+    Output is maze with filled squares turned into walls closed on every side.
+    :param maze:
+    :return: Maze
+    """
+    cells = maze.cells
+    graph = MazeGraph.from_maze(maze)
+    degrees = np.diff(graph.offsets)
+    alive = IS_NODE[cells].copy()
+    protected = IS_PROTECTED[cells]
+    dead = np.flatnonzero(alive & (degrees <= 1) & ~protected)
+    while len(dead):
+        alive[dead] = False
+        # squares next to newly filled ones lose an edge, only they can become dead ends
+        neighbors = graph.targets[get_edge_indices(graph.offsets, dead)]
+        neighbors = neighbors[alive[neighbors]]
+        np.subtract.at(degrees, neighbors, 1)
+        neighbors = np.unique(neighbors)
+        dead = neighbors[(degrees[neighbors] <= 1) & ~protected[neighbors]]
+    filled = IS_NODE[cells] & ~alive
+    values = cells.copy()
+    values[filled] = FILLED
+    # close borders of neighbors facing filled squares, so no edge passes through them
+    grid = values.reshape(maze.height, maze.width)
+    filled = filled.reshape(maze.height, maze.width)
+    grid[:, :-1][filled[:, 1:]] |= np.uint8(Border.RIGHT)
+    grid[:, 1:][filled[:, :-1]] |= np.uint8(Border.LEFT)
+    grid[:-1][filled[1:]] |= np.uint8(Border.BOTTOM)
+    grid[1:][filled[:-1]] |= np.uint8(Border.TOP)
+    return Maze(maze.width, maze.height, values.tobytes(), trusted=True)
+
+
+def get_edge_indices(offsets: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """
+    Input offsets of compressed sparse rows and square indices
+    Output is positions of every edge leaving those squares
+    :param offsets:
+    :param indices:
+    :return: np.ndarray
+    """
+    starts = offsets[indices]
+    counts = offsets[indices + 1] - starts
+    # position of each edge within the edges of its square, added to start of those edges
+    ends = np.cumsum(counts)
+    return np.repeat(starts - ends + counts, counts) + np.arange(ends[-1] if len(ends) else 0)
@@ -0,0 +1,137 @@
+# to measure distances to many squares of one maze at once, one process per CPU
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import math
+
+# to order rewards in vectorized sweeps over subsets of rewards
+import numpy as np
+
+from src.graphs.distance_field import DistanceField
+from src.graphs.maze_graph import MazeGraph
+from src.graphs.search import dijkstra
+from src.models.maze import Maze
+
+# most rewards a route is ordered over, table of routes doubles in size with each reward
+MAX_REWARDS: int = 16
+
+# maze graph measured by a worker process, built once by start_worker
+WORKER_GRAPH: MazeGraph | None = None
+
+
+def collect_rewards(
+    maze: Maze, avoid_enemies: bool = False, workers: int | None = None, bonus=1, penalty=2
+) -> list[int] | None:
+    """
+    Input maze instance, whether enemies are obstacles, number of worker processes,
+    and weight options.
+    Measures, in worker processes, distances between entrance, every reward, and exit,
+    then orders rewards so that a route from entrance through all of them to exit
+    weighs the least, see order_rewards, and fills in path between consecutive stops.
+    Output is list of square indices from entrance to exit through every reward
+    or None if entrance, any reward, or exit can't be reached.
+    :param maze:
+    :param avoid_enemies: if True, route never enters an enemy square
+    :param workers: number of processes, one per CPU if None
+    :param bonus:
+    :param penalty:
+    :return: list[int] | None
+    """
+    roles = maze.roles
+    if len(roles.rewards) > MAX_REWARDS:
+        raise ValueError(f"Too many rewards to collect: {len(roles.rewards)} > {MAX_REWARDS}")
+    if avoid_enemies:
+        # an edge into an enemy can't be taken, so no path passes through one
+        penalty = math.inf
+    entrance, exit_ = roles.ends
+    stops = [entrance, *roles.rewards, exit_]
+    # only packed values reach workers, a memory mapped maze can't be sent as it is
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=start_worker,
+        initargs=(maze.width, maze.height, bytes(maze.values), bonus, penalty),
+    ) as executor:
+        columns = list(executor.map(measure_to, stops[1:], repeat(stops)))
+    # entrance is never a stop to go to, its column is never read
+    distances = np.zeros((len(stops), len(stops)))
+    distances[:, 1:] = np.column_stack(columns)
+    if (order := order_rewards(distances)) is None:
+        return None
+    stops = [entrance, *(roles.rewards[position] for position in order), exit_]
+    graph = MazeGraph.from_maze(maze, bonus=bonus, penalty=penalty)
+    path = [entrance]
+    for source, target in zip(stops, stops[1:]):
+        path.extend(dijkstra(graph, source, target)[1:])
+    return path
+
+
+def start_worker(width: int, height: int, values: bytes, bonus=1, penalty=2) -> None:
+    """
+    Input maze width, height, packed values, and weight options,
+    run once in each worker process of collect_rewards
+    Builds the maze graph every measure_to of the worker reads
+    :param width:
+    :param height:
+    :param values:
+    :param bonus:
+    :param penalty:
+    :return: None
+    """
+    global WORKER_GRAPH
+    maze = Maze(width, height, values, trusted=True)
+    WORKER_GRAPH = MazeGraph.from_maze(maze, bonus=bonus, penalty=penalty)
+
+
+def measure_to(target: int, stops: list[int]) -> np.ndarray:
+    """
+    Input square index to measure towards and square indices of stops,
+    run in worker processes of collect_rewards after start_worker
+    Output is distance from each stop to target, infinite if unreachable
+    :param target:
+    :param stops:
+    :return: np.ndarray
+    """
+    return DistanceField.from_graph(WORKER_GRAPH, (target,)).distances[stops]
+
+
+def order_rewards(distances: np.ndarray) -> list[int] | None:
+    """
+    Input table of distance from each stop to every stop, entrance first, then rewards, exit last
+    Finds cheapest route from entrance through every reward to exit with the Held-Karp algorithm,
+    cheapest route through each subset of rewards ending at each of them is built
+    from cheapest routes through subsets one reward smaller, one subset at a time,
+    over bitmasks of rewards in increasing order
+    Output is positions of rewards in order of route, or None if no route reaches exit
+    :param distances:
+    :return: list[int] | None
+    """
+    count = len(distances) - 2
+    if not count:
+        return [] if math.isfinite(distances[0, -1]) else None
+    rewards = np.arange(count)
+    bits = 1 << rewards
+    full = (1 << count) - 1
+    # costs[mask, last] is cheapest route through rewards of mask ending at reward last
+    costs = np.full((1 << count, count), math.inf)
+    parents = np.full((1 << count, count), -1, dtype=np.int8)
+    costs[bits, rewards] = distances[0, 1:-1]
+    between = distances[1:-1, 1:-1]
+    for mask in range(1, full):
+        # routes through mask end only at rewards of mask, others stay infinite
+        candidates = costs[mask, :, None] + between
+        previous = candidates.argmin(axis=0)
+        best = candidates[previous, rewards]
+        following = rewards[(mask & bits == 0) & np.isfinite(best)]
+        extended = mask | bits[following]
+        improved = best[following] < costs[extended, following]
+        costs[extended[improved], following[improved]] = best[following][improved]
+        parents[extended[improved], following[improved]] = previous[following][improved]
+    totals = costs[full] + distances[1:-1, -1]
+    if not math.isfinite(totals[last := int(totals.argmin())]):
+        return None
+    order = []
+    mask = full
+    while last != -1:
+        order.append(last)
+        mask, last = mask ^ int(bits[last]), int(parents[mask, last])
+    order.reverse()
+    return order
@@ -0,0 +1,391 @@
+# to keep frontier of search ordered by distance
+from collections import deque
+import heapq
+import math
+from typing import Callable, TypeAlias
+
+# to tell which weights edges of a graph have without reading them one at a time
+import numpy as np
+
+from src.graphs.maze_graph import MazeGraph
+
+# estimates distance from a square index to a target square index, must never overestimate
+Heuristic: TypeAlias = Callable[[MazeGraph, int, int], float]
+# searches shortest path from a source square index to a target square index
+Search: TypeAlias = Callable[[MazeGraph, int, int], list[int] | None]
+
+# largest whole edge weight searched with a bucket per distance, beyond it a heap is faster
+DIAL_LIMIT: int = 64
+
+
+def manhattan(graph: MazeGraph, index: int, target: int) -> float:
+    """
+    Input maze graph and two square indices.
+    Moves are along rows and columns, so distance is never less than this.
+    :param graph:
+    :param index:
+    :param target:
+    :return: float
+    """
+    row, column = divmod(index, graph.width)
+    target_row, target_column = divmod(target, graph.width)
+    return abs(row - target_row) + abs(column - target_column)
+
+
+def euclidean(graph: MazeGraph, index: int, target: int) -> float:
+    """
+    Input maze graph and two square indices.
+    Straight line distance, same measure as converter.Edge.distance.
+    :param graph:
+    :param index:
+    :param target:
+    :return: float
+    """
+    return math.dist(divmod(index, graph.width), divmod(target, graph.width))
+
+
+def zero(graph: MazeGraph, index: int, target: int) -> float:
+    """
+    Input maze graph and two square indices.
+    No estimate, turns A* into Dijkstra's algorithm.
+    :param graph:
+    :param index:
+    :param target:
+    :return: float
+    """
+    return 0
+
+
+def dijkstra(graph: MazeGraph, source: int, target: int) -> list[int] | None:
+    """
+    Input maze graph and source and target square indices.
+    Search shortest path over square indices with Dijkstra's algorithm.
+    Output is list of square indices from source to target or None if unreachable.
+    :param graph:
+    :param source:
+    :param target:
+    :return: list[int] | None
+    """
+    return astar(graph, source, target, zero)
+
+
+def astar(
+    graph: MazeGraph,
+    source: int,
+    target: int,
+    heuristic: Heuristic = manhattan,
+) -> list[int] | None:
+    """
+    Input maze graph, source and target square indices, and heuristic.
+    Search shortest path over square indices with A*, expanding squares closest
+    to target first.
+    Output is list of square indices from source to target or None if unreachable.
+    :param graph:
+    :param source:
+    :param target:
+    :param heuristic:
+    :return: list[int] | None
+    """
+    offsets, targets, weights = graph.adjacency
+    discount = graph.discount
+    distances: dict[int, float] = {source: 0}
+    previous: dict[int, int] = {}
+    # ties of estimated total go to the square farthest along, closest to target,
+    # otherwise every square of an open room is expanded before target
+    frontier = [(get_estimate(graph, heuristic, source, target, discount), 0, source)]
+    while frontier:
+        _, progress, index = heapq.heappop(frontier)
+        distance = -progress
+        if index == target:
+            return get_path(previous, target)
+        # skip stale frontier entries that were improved after being pushed
+        if distance > distances[index]:
+            continue
+        for edge in range(offsets[index], offsets[index + 1]):
+            neighbor = targets[edge]
+            if (candidate := distance + weights[edge]) < distances.get(neighbor, math.inf):
+                # estimate with rewards is not consistent, so squares may be reached again and reopened
+                distances[neighbor] = candidate
+                previous[neighbor] = index
+                estimate = get_estimate(graph, heuristic, neighbor, target, discount)
+                heapq.heappush(frontier, (candidate + estimate, -candidate, neighbor))
+    return None
+
+
+def get_estimate(
+    graph: MazeGraph, heuristic: Heuristic, index: int, target: int, discount: float
+) -> float:
+    """
+    Input maze graph, heuristic, square index, target square index,
+    and most any path can weigh less than its distance, see MazeGraph.discount.
+    Entering a reward can take bonus off the remaining cost,
+    so every possible reduction is taken off the estimate to never overestimate,
+    but no edge weighs less than zero, so no estimate is either,
+    and target is estimated at zero, so it is never settled before a shorter path is found.
+    Output is estimate of weight of path from square to target.
+    :param graph:
+    :param heuristic:
+    :param index:
+    :param target:
+    :param discount:
+    :return: float
+    """
+    return max(heuristic(graph, index, target) - discount, 0)
+
+
+def bidirectional(graph: MazeGraph, source: int, target: int) -> list[int] | None:
+    """
+    Input maze graph and source and target square indices.
+    Search shortest path with Dijkstra's algorithm from source along edges
+    and from target along reversed edges at the same time, always expanding the closer frontier.
+    Stops once no path through the frontiers can be shorter than the best path where they met,
+    so each search only covers about half the distance.
+    Output is list of square indices from source to target or None if unreachable.
+    :param graph:
+    :param source:
+    :param target:
+    :return: list[int] | None
+    """
+    offsets, targets, weights = graph.adjacency
+    # forward search first, backward search second,
+    # backward search walks edges into each square, which weigh by the role of that square
+    edge_weights = (weights, graph.reverse_weights)
+    distances: tuple[dict[int, float], dict[int, float]] = ({source: 0}, {target: 0})
+    previous: tuple[dict[int, int], dict[int, int]] = ({}, {})
+    frontiers = ([(0, source)], [(0, target)])
+    best, meeting = (0, source) if source == target else (math.inf, None)
+    while frontiers[0] and frontiers[1]:
+        # any path still to be found passes both frontiers
+        if frontiers[0][0][0] + frontiers[1][0][0] >= best:
+            break
+        side = 0 if frontiers[0][0][0] <= frontiers[1][0][0] else 1
+        distance, index = heapq.heappop(frontiers[side])
+        # skip stale frontier entries that were improved after being pushed
+        if distance > distances[side][index]:
+            continue
+        for edge in range(offsets[index], offsets[index + 1]):
+            neighbor = targets[edge]
+            candidate = distance + edge_weights[side][edge]
+            if candidate < distances[side].get(neighbor, math.inf):
+                distances[side][neighbor] = candidate
+                previous[side][neighbor] = index
+                heapq.heappush(frontiers[side], (candidate, neighbor))
+            # path through neighbor joins both searches
+            if (total := candidate + distances[1 - side].get(neighbor, math.inf)) < best:
+                best, meeting = total, neighbor
+    if meeting is None:
+        return None
+    # previous of backward search leads from meeting square on to target
+    path = get_path(previous[0], meeting)
+    while path[-1] in previous[1]:
+        path.append(previous[1][path[-1]])
+    return path
+
+
+def check_weights(graph: MazeGraph) -> bool:
+    """
+    Input maze graph.
+    Raises exception if a cycle weighs less than zero, then no path is shortest,
+    see MazeGraph.negative_cycle.
+    Output is whether any edge weighs less than zero, then only bellman_ford is exact.
+    :param graph:
+    :return: boolean
+    """
+    if graph.negative_cycle:
+        raise ValueError("Maze graph has a cycle that weighs less than zero")
+    return graph.negative_edges
+
+
+def select_search(graph: MazeGraph) -> Search:
+    """
+    Input maze graph.
+    Picks the fastest search that is exact for the weights of graph,
+    edges that can't be taken, infinitely heavy, don't count.
+    Raises exception if a cycle weighs less than zero.
+    Output is zero_one_bfs if every edge weighs zero or one, dial if every edge weighs
+    a small whole number, bellman_ford if any edge weighs less than zero, otherwise dijkstra.
+    :param graph:
+    :return: Search
+    """
+    if check_weights(graph):
+        return bellman_ford
+    weights = graph.weights[np.isfinite(graph.weights)]
+    if not len(weights):
+        return dijkstra
+    if np.all(weights == np.round(weights)):
+        if weights.max() <= 1:
+            return zero_one_bfs
+        if weights.max() <= DIAL_LIMIT:
+            return dial
+    return dijkstra
+
+
+def zero_one_bfs(graph: MazeGraph, source: int, target: int) -> list[int] | None:
+    """
+    Input maze graph whose edges weigh zero or one, and source and target square indices.
+    Search shortest path with breadth first search over a deque instead of a heap,
+    squares reached over an edge that weighs zero go to the front, so deque stays
+    ordered by distance.
+    Output is list of square indices from source to target or None if unreachable.
+    :param graph:
+    :param source:
+    :param target:
+    :return: list[int] | None
+    """
+    offsets, targets, weights = graph.adjacency
+    distances: dict[int, float] = {source: 0}
+    previous: dict[int, int] = {}
+    frontier = deque([(0, source)])
+    while frontier:
+        distance, index = frontier.popleft()
+        if index == target:
+            return get_path(previous, target)
+        # skip stale frontier entries that were improved after being pushed
+        if distance > distances[index]:
+            continue
+        for edge in range(offsets[index], offsets[index + 1]):
+            neighbor, weight = targets[edge], weights[edge]
+            if (candidate := distance + weight) < distances.get(neighbor, math.inf):
+                distances[neighbor] = candidate
+                previous[neighbor] = index
+                if weight:
+                    frontier.append((candidate, neighbor))
+                else:
+                    frontier.appendleft((candidate, neighbor))
+    return None
+
+
+def dial(graph: MazeGraph, source: int, target: int) -> list[int] | None:
+    """
+    Input maze graph whose edges weigh small whole numbers, and source and target square indices.
+    Search shortest path with Dial's algorithm, Dijkstra's algorithm with a bucket
+    of squares per distance instead of a heap. No edge reaches further than the heaviest edge,
+    so buckets are reused in a circle one longer than that.
+    Output is list of square indices from source to target or None if unreachable.
+    :param graph:
+    :param source:
+    :param target:
+    :return: list[int] | None
+    """
+    offsets, targets, weights = graph.adjacency
+    heaviest = graph.weights[np.isfinite(graph.weights)].max(initial=0)
+    buckets: list[list[int]] = [[] for _ in range(int(heaviest) + 1)]
+    buckets[0].append(source)
+    distances: dict[int, float] = {source: 0}
+    previous: dict[int, int] = {}
+    distance, pending = 0, 1
+    while pending:
+        # edges that weigh zero add to the bucket being emptied
+        bucket = buckets[distance % len(buckets)]
+        while bucket:
+            index = bucket.pop()
+            pending -= 1
+            # skip stale bucket entries that were improved after being added
+            if distances[index] != distance:
+                continue
+            if index == target:
+                return get_path(previous, target)
+            for edge in range(offsets[index], offsets[index + 1]):
+                neighbor = targets[edge]
+                if (candidate := distance + weights[edge]) < distances.get(neighbor, math.inf):
+                    distances[neighbor] = candidate
+                    previous[neighbor] = index
+                    buckets[int(candidate) % len(buckets)].append(neighbor)
+                    pending += 1
+        distance += 1
+    return None
+
+
+def bellman_ford(graph: MazeGraph, source: int, target: int) -> list[int] | None:
+    """
+    Input maze graph and source and target square indices.
+    Search shortest path with the Bellman-Ford algorithm, relaxing edges of squares
+    queued whenever their distance improves, exact even when edges weigh less than zero,
+    like edges into rewards with a bonus larger than their distance.
+    Raises exception if a cycle weighs less than zero, then paths are endlessly shorter.
+    Output is list of square indices from source to target or None if unreachable.
+    :param graph:
+    :param source:
+    :param target:
+    :return: list[int] | None
+    """
+    check_weights(graph)
+    offsets, targets, weights = graph.adjacency
+    distances: dict[int, float] = {source: 0}
+    previous: dict[int, int] = {}
+    frontier = deque([source])
+    queued = {source}
+    while frontier:
+        index = frontier.popleft()
+        queued.discard(index)
+        distance = distances[index]
+        for edge in range(offsets[index], offsets[index + 1]):
+            neighbor = targets[edge]
+            if (candidate := distance + weights[edge]) < distances.get(neighbor, math.inf):
+                distances[neighbor] = candidate
+                previous[neighbor] = index
+                if neighbor not in queued:
+                    frontier.append(neighbor)
+                    queued.add(neighbor)
+    if target not in distances:
+        return None
+    return get_path(previous, target)
+
+
+def get_path(previous: dict[int, int], target: int) -> list[int]:
+    """
+    Input map of each reached index to index it was reached from, and target index.
+    Follow map back from target to source.
+    Output is list of indices from source to target.
+    :param previous:
+    :param target:
+    :return: list[int]
+    """
+    path = [target]
+    while path[-1] in previous:
+        path.append(previous[path[-1]])
+    path.reverse()
+    return path
+
+
+def search_all(
+    graph: MazeGraph, source: int, target: int
+) -> tuple[dict[int, float], dict[int, list[int]]]:
+    """
+    Input maze graph and source and target square indices.
+    Search with Dijkstra's algorithm until every square as close as target is settled,
+    keeping every square a square can be reached from along a shortest path.
+    Squares joined by edges that weigh zero both ways, like neighboring rewards,
+    are predecessors of each other, so predecessors may form cycles of squares at one distance.
+    Output is map of settled square index to distance from source,
+    and map of reached square index to list of predecessor indices, source has none.
+    :param graph:
+    :param source:
+    :param target:
+    :return: tuple[dict[int, float], dict[int, list[int]]]
+    """
+    offsets, targets, weights = graph.adjacency
+    distances: dict[int, float] = {source: 0}
+    predecessors: dict[int, list[int]] = {source: []}
+    settled: set[int] = set()
+    frontier = [(0, source)]
+    while frontier:
+        distance, index = heapq.heappop(frontier)
+        # skip stale frontier entries that were improved after being pushed
+        if distance > distances[index]:
+            continue
+        # every square on a shortest path to target is settled
+        if distance > distances.get(target, math.inf):
+            break
+        settled.add(index)
+        for edge in range(offsets[index], offsets[index + 1]):
+            neighbor = targets[edge]
+            candidate = distance + weights[edge]
+            known = distances.get(neighbor, math.inf)
+            if candidate < known:
+                distances[neighbor] = candidate
+                predecessors[neighbor] = [index]
+                heapq.heappush(frontier, (candidate, neighbor))
+            elif candidate == known and math.isfinite(candidate):
+                predecessors[neighbor].append(index)
+    return {index: distances[index] for index in settled}, predecessors
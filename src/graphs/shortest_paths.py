@@ -0,0 +1,273 @@
+# parent to data classes that are expected by only contain and modify their own data
+from dataclasses import dataclass
+# to cache method results to avoid recalculations when recalled
+from functools import cached_property
+import random
+from typing import Iterator
+
+# to find cycles of predecessors among squares at one distance
+import networkx as nx
+import numpy as np
+
+from src.graphs.maze_graph import MazeGraph
+from src.graphs.search import search_all
+
+
+@dataclass(frozen=True, eq=False)
+class ShortestPaths:
+    """
+    Immutable dataclass of every shortest path from source to target,
+    as a graph of predecessors over square indices
+    Paths are counted, sampled, and enumerated from it without ever listing all of them
+    Predecessors only form cycles among squares joined by edges that weigh zero,
+    like neighboring rewards, those are grouped, see groups, and paths visit each square once
+    """
+    source: int
+    target: int
+    distances: np.ndarray
+    predecessors: dict[int, list[int]]
+
+    @classmethod
+    def from_graph(cls, graph: MazeGraph, source: int, target: int) -> "ShortestPaths":
+        """
+        Input maze graph and source and target square indices.
+        Searches graph once for distances and shortest path predecessors.
+        :param graph:
+        :param source:
+        :param target:
+        :return: ShortestPaths
+        """
+        found, predecessors = search_all(graph, source, target)
+        # squares that were not settled are farther than target, or unreachable
+        distances = np.full(graph.size, np.inf)
+        distances[list(found)] = list(found.values())
+        return cls(source, target, distances, predecessors)
+
+    @property
+    def reachable(self) -> bool:
+        """
+        Returns if there is any path from source to target
+        :return: boolean
+        """
+        return bool(np.isfinite(self.distances[self.target]))
+
+    @property
+    def distance(self) -> float:
+        """
+        Returns weight of every shortest path, infinite if there is none
+        :return: float
+        """
+        return float(self.distances[self.target])
+
+    @cached_property
+    def groups(self) -> dict[int, tuple[int, ...]]:
+        """
+        Returns squares of each cycle of predecessors, by each of its squares, in ascending order
+        Squares that are on no cycle are groups on their own and left out
+        :return: dict[int, tuple[int, ...]]
+        """
+        # only squares at one distance can be predecessors of each other
+        ties = nx.DiGraph()
+        ties.add_edges_from(
+            (previous, index)
+            for index, predecessors in self.predecessors.items()
+            for previous in predecessors
+            if self.distances[previous] == self.distances[index]
+        )
+        groups = {}
+        for component in nx.strongly_connected_components(ties):
+            if len(component) > 1:
+                group = tuple(sorted(component))
+                groups.update(dict.fromkeys(group, group))
+        return groups
+
+    @cached_property
+    def order(self) -> list[tuple[int, ...]]:
+        """
+        Returns every group of squares on a shortest path, see groups,
+        each after all groups of predecessors of its squares
+        :return: list[tuple[int, ...]]
+        """
+        if not self.reachable:
+            return []
+        order = []
+        last = self.get_group(self.target)
+        visited = {last}
+        # depth first walk back from target, group is added once all groups before it are
+        stack = [(last, self.get_groups_before(last))]
+        while stack:
+            group, remaining = stack[-1]
+            previous = next(remaining, None)
+            if previous is None:
+                stack.pop()
+                order.append(group)
+            elif previous not in visited:
+                visited.add(previous)
+                stack.append((previous, self.get_groups_before(previous)))
+        return order
+
+    @cached_property
+    def counts(self) -> dict[int, int]:
+        """
+        Returns number of shortest paths from source to every square on a shortest path
+        A path passes through a group at most once, so paths to a square of a group are
+        paths into the group at each of its squares, times ways on inside group, see get_ways_in
+        Counts are exact however large they grow
+        :return: dict[int, int]
+        """
+        counts: dict[int, int] = {}
+        for group in self.order:
+            if len(group) == 1:
+                counts[group[0]] = self.get_entering(group[0], group, counts)
+                continue
+            entering = {index: self.get_entering(index, group, counts) for index in group}
+            for index in group:
+                counts[index] = sum(entering[way[-1]] for way in self.get_ways_in(index, group))
+        return counts
+
+    @cached_property
+    def successors(self) -> dict[int, list[int]]:
+        """
+        Returns squares that follow every square on a shortest path, in ascending order
+        :return: dict[int, list[int]]
+        """
+        successors: dict[int, list[int]] = {index: [] for group in self.order for index in group}
+        for group in self.order:
+            for index in group:
+                for previous in self.predecessors[index]:
+                    successors[previous].append(index)
+        for following in successors.values():
+            following.sort()
+        return successors
+
+    def get_group(self, index: int) -> tuple[int, ...]:
+        """
+        Input square index
+        Output is squares of its group, see groups
+        :param index:
+        :return: tuple[int, ...]
+        """
+        return self.groups.get(index, (index,))
+
+    def get_groups_before(self, group: tuple[int, ...]) -> Iterator[tuple[int, ...]]:
+        """
+        Input squares of a group
+        Output is iterator of groups of predecessors of its squares, other than group itself
+        :param group:
+        :return: Iterator[tuple[int, ...]]
+        """
+        return (
+            self.get_group(previous)
+            for index in group
+            for previous in self.predecessors[index]
+            if previous not in group
+        )
+
+    def get_entering(self, index: int, group: tuple[int, ...], counts: dict[int, int]) -> int:
+        """
+        Input square index, squares of its group, and path counts of every group before it
+        Output is number of shortest paths that enter group at square, source is entered once
+        :param index:
+        :param group:
+        :param counts:
+        :return: integer
+        """
+        entering = sum(
+            counts[previous] for previous in self.predecessors[index] if previous not in group
+        )
+        return entering + (index == self.source)
+
+    def get_ways_in(self, index: int, group: tuple[int, ...]) -> Iterator[list[int]]:
+        """
+        Input square index and squares of its group
+        Walks predecessors back from square, never leaving group or visiting a square twice
+        Output is iterator of every path inside group that ends at square, from last square to first
+        :param index:
+        :param group:
+        :return: Iterator[list[int]]
+        """
+        yield [index]
+        if len(group) == 1:
+            return
+        path = [index]
+        stack = [iter(self.predecessors[index])]
+        while stack:
+            previous = next(stack[-1], None)
+            if previous is None:
+                stack.pop()
+                path.pop()
+            elif previous in group and previous not in path:
+                path.append(previous)
+                stack.append(iter(self.predecessors[previous]))
+                yield path.copy()
+
+    def count(self) -> int:
+        """
+        Returns number of shortest paths from source to target
+        :return: integer
+        """
+        return self.counts.get(self.target, 0)
+
+    def sample(self, rng: random.Random | None = None) -> list[int] | None:
+        """
+        Input random number generator, module level one if None
+        Every shortest path is equally likely to be returned
+        Output is list of square indices from source to target, None if there is no path
+        :param rng:
+        :return: list[int] | None
+        """
+        if not self.reachable:
+            return None
+        # module level generator follows random.seed, so sampling repeats after seeding
+        randrange = random.randrange if rng is None else rng.randrange
+        path = [self.target]
+        while True:
+            # choose way inside group, then predecessor before it,
+            # each in proportion to number of paths through it
+            group = self.get_group(path[-1])
+            ways = list(self.get_ways_in(path[-1], group))
+            entering = [self.get_entering(way[-1], group, self.counts) for way in ways]
+            choice = randrange(sum(entering))
+            for way, count in zip(ways, entering):
+                choice -= count
+                if choice < 0:
+                    path.extend(way[1:])
+                    break
+            if path[-1] == self.source:
+                break
+            choice = randrange(count)
+            for previous in self.predecessors[path[-1]]:
+                if previous not in group:
+                    choice -= self.counts[previous]
+                    if choice < 0:
+                        path.append(previous)
+                        break
+        path.reverse()
+        return path
+
+    def __iter__(self) -> Iterator[list[int]]:
+        """
+        Enumerate shortest paths in lexicographic order of square indices, one at a time
+        :return: Iterator
+        """
+        if not self.reachable:
+            return
+        path = [self.source]
+        visited = {self.source}
+        # iterator of successors left to try for each square of path
+        stack = [iter(self.successors[self.source])]
+        while stack:
+            following = next(stack[-1], None)
+            if following is None:
+                stack.pop()
+                visited.discard(path.pop())
+            elif following in visited:
+                continue
+            elif following == self.target:
+                yield [*path, following]
+            else:
+                path.append(following)
+                visited.add(following)
+                stack.append(iter(self.successors[following]))
+        if self.source == self.target:
+            yield [self.source]
@@ -1,45 +1,508 @@
+# to solve many maze files at once, one process per CPU
+from concurrent.futures import ProcessPoolExecutor, as_completed
+# to check time budget while solutions are enumerated
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
 import networkx as nx
 
-from src.graphs.converter import make_graph
+from src.graphs.cache import (
+    get_components,
+    get_distance_field,
+    get_jump_grid,
+    get_maze_graph,
+    get_networkx_graph,
+    get_pruned_maze,
+    get_weighted_graph,
+)
+from src.graphs.converter import expand_path
+from src.graphs.jump_points import jump_search
+from src.graphs.rewards import collect_rewards
+from src.graphs.search import (
+    Heuristic,
+    astar,
+    bidirectional,
+    check_weights,
+    manhattan,
+    select_search,
+)
+from src.graphs.shortest_paths import ShortestPaths
+from src.graphs.tiles import tiled_search
+from src.graphs.weight_model import WeightModel
 from src.models.maze import Maze
 from src.models.solution import Solution
+from src.persistence.solutions import dump_solutions, load_solutions
 
 
-def solve(maze: Maze) -> Solution | None:
-    try:
-        # returns solution instance if found
-        return Solution(
-            squares=tuple(
-                # returns list of one of the shortest paths
-                nx.shortest_path(
-                    # convert maze into graph
-                    make_graph(maze),
-                    # specify start
-                    source=maze.entrance,
-                    # specify exit
-                    target=maze.exit,
-                    weight="weight",
-                )
-            )
+def solve(
+    maze: Maze,
+    backend: str = "native",
+    path: Path | None = None,
+    prune: bool = False,
+    **options,
+) -> Solution | None:
+    """
+    Input maze instance, name of solver backend, and options for that backend.
+    If path of maze file is given, solution is looked up in and saved to a solutions file next to it,
+    unless an option is a function without a stable name, see get_key.
+    If prune, dead ends are filled before searching, see pruning.fill_dead_ends.
+    Output is one of the shortest solutions or None if maze has no solution.
+    :param maze:
+    :param backend: "native", "weighted", "astar", "bidirectional", "jump", "tiled", "rewards",
+        or "networkx"
+    :param path:
+    :param prune:
+    :param options: e.g. heuristic for "astar", tile_size for "tiled", model for "weighted",
+        bonus and penalty for the others
+    :return: Solution | None
+    """
+    indices = solve_indices(maze, backend, path, prune, **options)
+    # returns solution instance if found
+    return None if indices is None else make_solution(maze, indices)
+
+
+def solve_indices(
+    maze: Maze,
+    backend: str = "native",
+    path: Path | None = None,
+    prune: bool = False,
+    **options,
+) -> list[int] | None:
+    """
+    Same as solve, without creating squares.
+    Output is square indices of one of the shortest paths or None if maze has no solution.
+    :param maze:
+    :param backend:
+    :param path:
+    :param prune:
+    :param options:
+    :return: list[int] | None
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown solver backend: {backend}")
+    key = get_key("solve", backend, options | {"prune": True} if prune else options)
+    # no solution is cached as an empty list of paths, nothing is cached without a key
+    if key is None:
+        path = None
+    if path is not None and (paths := load_solutions(path, maze.digest).get(key)) is not None:
+        return paths[0] if paths else None
+    # returns list of square indices of one of the shortest paths,
+    # unless exit can't be reached at all, then no graph is built,
+    # tiled search never holds arrays of the whole maze, so it finds unreachable exits itself
+    indices = None
+    if backend == "tiled" or is_solvable(maze):
+        searched = get_pruned_maze(maze) if prune else maze
+        check_backend(searched, backend, options)
+        indices = BACKENDS[backend](searched, **options)
+    if path is not None:
+        dump_solutions(path, maze.digest, key, [] if indices is None else [indices])
+    return indices
+
+
+def check_backend(maze: Maze, backend: str, options: dict) -> None:
+    """
+    Input maze instance, name of solver backend, and options for that backend
+    Backends of NEGATIVE_BACKENDS search any weights and raise on cycles that weigh less than zero
+    from the graph they build anyway, every other backend only searches with Dijkstra's algorithm
+    or estimates, which settle squares before every shorter path is found,
+    so it is refused from weight options alone, without building a graph of the whole maze
+    Raises exception if any edge may weigh less than zero and backend can't search it
+    :param maze:
+    :param backend:
+    :param options:
+    :return: None
+    """
+    if backend in NEGATIVE_BACKENDS:
+        return
+    if may_weigh_less_than_zero(maze, options.get("bonus", 1), options.get("penalty", 2)):
+        raise ValueError(
+            f"Solver backend {backend} needs edges that weigh zero or more, "
+            f"use one of {', '.join(sorted(NEGATIVE_BACKENDS))}"
         )
-    except nx.NetworkXException:
-        return None
 
 
-def solve_all(maze: Maze) -> list[Solution]:
+def may_weigh_less_than_zero(maze: Maze, bonus=1, penalty=2) -> bool:
+    """
+    Input maze instance and weight options
+    An edge is at least as long as the number of squares it enters, so it only weighs less
+    than zero if entering a square costs more than one off, a reward with a bonus above one
+    or an enemy with a penalty below minus one, see converter.role_weight
+    Output is whether any edge of maze graph may weigh less than zero
+    :param maze:
+    :param bonus:
+    :param penalty:
+    :return: boolean
+    """
+    roles = maze.roles
+    return bool(roles.rewards) and bonus > 1 or bool(roles.enemies) and penalty < -1
+
+
+def is_solvable(maze: Maze) -> bool:
+    """
+    Input maze instance.
+    Squares are labelled by connected component once per maze and cached,
+    after which checking takes constant time.
+    Raises exception if maze has no entrance or no exit.
+    Output is whether exit can be reached from entrance at all.
+    :param maze:
+    :return: boolean
+    """
+    entrance, exit_ = maze.roles.ends
+    labels = get_components(maze)
+    return bool(labels[entrance] == labels[exit_])
+
+
+def solve_many(
+    paths: Iterable[Path], workers: int | None = None, backend: str = "native", **options
+) -> Iterator[tuple[Path, list[int] | Exception | None]]:
+    """
+    Input paths of maze files, number of worker processes, and solver backend and options.
+    Each maze file is loaded and solved in a worker process, only paths are sent to workers
+    and only square indices are sent back, solutions files next to maze files are used as by solve.
+    A maze file that can't be loaded or solved has the exception it raised as its result,
+    so one bad file never ends the rest. Mazes not started yet are cancelled once iteration stops.
+    Output is iterator of maze file path and square indices of a shortest path, None if unsolvable,
+    in the order mazes finish solving.
+    :param paths:
+    :param workers: number of processes, one per CPU if None
+    :param backend: "native", "weighted", "astar", "bidirectional", "jump", "tiled", "rewards",
+        or "networkx"
+    :param options: e.g. heuristic for "astar", must be importable by name to reach workers
+    :return: Iterator[tuple[Path, list[int] | Exception | None]]
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown solver backend: {backend}")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            futures = {
+                executor.submit(solve_file, path, backend, options): path for path in paths
+            }
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as error:
+                    result = error
+                yield futures[future], result
+        finally:
+            # consumer stopped early, only mazes already being solved are waited for
+            executor.shutdown(cancel_futures=True)
+
+
+def solve_file(path: Path, backend: str, options: dict) -> list[int] | None:
+    """
+    Input path of maze file, solver backend, and options, run in worker processes of solve_many
+    Output is square indices of a shortest path or None if maze has no solution
+    :param path:
+    :param backend:
+    :param options:
+    :return: list[int] | None
+    """
+    return solve_indices(Maze.load(path), backend, path, **options)
+
+
+def make_solution(maze: Maze, indices: list[int]) -> Solution:
+    """
+    Input maze instance and square indices of a path
+    Output is solution of those squares
+    :param maze:
+    :param indices:
+    :return: Solution
+    """
+    return Solution(squares=tuple(maze[index] for index in indices))
+
+
+def get_key(kind: str, backend: str, options: dict) -> str | None:
+    """
+    Input kind of solve, name of backend, and backend options
+    Output is key cached solutions are stored under, functions are named by module and
+    qualified name, None if any function has no stable name, e.g. a lambda or nested function,
+    so solutions of different functions are never stored under one key
+    :param kind:
+    :param backend:
+    :param options:
+    :return: string | None
+    """
+    names = []
+    for name, value in sorted(options.items()):
+        if callable(value) and hasattr(value, "__qualname__"):
+            if "<" in value.__qualname__:
+                return None
+            value = f"{value.__module__}.{value.__qualname__}"
+        names.append(f"{name}={value}")
+    return f"{kind}:{backend}:{','.join(names)}"
+
+
+def solve_networkx(
+    maze: Maze, contract: bool = False, bonus=1, penalty=2
+) -> list[int] | None:
+    """
+    Reference backend, converts maze into networkx graph and searches it
+    If contract, searches graph of decision points and expands path back into every square
+    :param maze:
+    :param contract:
+    :param bonus:
+    :param penalty:
+    :return: list[int] | None
+    """
+    # convert maze into graph, or reuse graph of same maze
+    graph = get_networkx_graph(maze, contract, bonus, penalty)
+    # dijkstra is only exact if no edge weighs less than zero
+    negative = any(weight < 0 for *_, weight in graph.edges.data("weight"))
     try:
-        # list comprehension to return list of shortest solutions
-        return [
-            Solution(squares=tuple(path))
-            for path in nx.all_shortest_paths(
-                make_graph(maze),
+        path = [
+            square.index
+            # returns list of one of the shortest paths
+            for square in nx.shortest_path(
+                graph,
+                # specify start
                 source=maze.entrance,
+                # specify exit
                 target=maze.exit,
                 weight="weight",
+                method="bellman-ford" if negative else "dijkstra",
             )
         ]
+    except nx.NetworkXUnbounded as error:
+        raise ValueError("Maze graph has a cycle that weighs less than zero") from error
     except nx.NetworkXException:
-        return []
+        return None
+    return expand_path(maze, path) if contract else path
+
+
+def solve_native(
+    maze: Maze, contract: bool = False, bonus=1, penalty=2
+) -> list[int] | None:
+    """
+    Searches square indices of maze graph built from packed values with Dijkstra's algorithm,
+    or the faster or safer search weights of graph allow, see search.select_search
+    If contract, searches graph of decision points and expands path back into every square
+    :param maze:
+    :param contract:
+    :param bonus:
+    :param penalty:
+    :return: list[int] | None
+    """
+    graph = get_maze_graph(maze, contract, bonus, penalty)
+    path = select_search(graph)(graph, *maze.roles.ends)
+    return expand_path(maze, path) if contract and path else path
+
+
+def solve_weighted(
+    maze: Maze, model: WeightModel, contract: bool = False
+) -> list[int] | None:
+    """
+    Searches square indices of maze graph weighed by a weight model,
+    edges of maze are built once and only weighed again for each model
+    :param maze:
+    :param model: cost of entering squares by role and by square index
+    :param contract:
+    :return: list[int] | None
+    """
+    graph = get_weighted_graph(maze, model, contract)
+    path = select_search(graph)(graph, *maze.roles.ends)
+    return expand_path(maze, path) if contract and path else path
+
+
+def solve_astar(
+    maze: Maze,
+    heuristic: Heuristic = manhattan,
+    contract: bool = False,
+    bonus=1,
+    penalty=2,
+) -> list[int] | None:
+    """
+    Searches square indices of maze with A*, guided towards exit by heuristic
+    :param maze:
+    :param heuristic: search.manhattan, search.euclidean, or any estimate that never overestimates
+    :param contract:
+    :param bonus:
+    :param penalty:
+    :return: list[int] | None
+    """
+    graph = get_maze_graph(maze, contract, bonus, penalty)
+    path = astar(graph, *maze.roles.ends, heuristic)
+    return expand_path(maze, path) if contract and path else path
+
+
+def solve_jump(
+    maze: Maze, heuristic: Heuristic = manhattan, bonus=1, penalty=2
+) -> list[int] | None:
+    """
+    Searches jump points of maze with A*, jumping over runs of squares with no role
+    :param maze:
+    :param heuristic:
+    :param bonus:
+    :param penalty:
+    :return: list[int] | None
+    """
+    graph = get_maze_graph(maze, False, bonus, penalty)
+    grid = get_jump_grid(maze, bonus, penalty)
+    path = jump_search(graph, grid, *maze.roles.ends, heuristic)
+    return expand_path(maze, path) if path else path
+
+
+def solve_bidirectional(
+    maze: Maze, contract: bool = False, bonus=1, penalty=2
+) -> list[int] | None:
+    """
+    Searches square indices of maze from entrance and exit at once until the searches meet
+    :param maze:
+    :param contract:
+    :param bonus:
+    :param penalty:
+    :return: list[int] | None
+    """
+    graph = get_maze_graph(maze, contract, bonus, penalty)
+    path = bidirectional(graph, *maze.roles.ends)
+    return expand_path(maze, path) if contract and path else path
+
+
+def solve_tiled(
+    maze: Maze, tile_size: int = 8, workers: int | None = None, bonus=1, penalty=2
+) -> list[int] | None:
+    """
+    Splits maze into tiles measured in parallel worker processes, for a single giant maze
+    :param maze:
+    :param tile_size: width and height of tiles in squares
+    :param workers: number of processes, one per CPU if None
+    :param bonus:
+    :param penalty:
+    :return: list[int] | None
+    """
+    return tiled_search(maze, tile_size, workers, bonus, penalty)
+
+
+def solve_rewards(
+    maze: Maze, avoid_enemies: bool = False, workers: int | None = None, bonus=1, penalty=2
+) -> list[int] | None:
+    """
+    Routes from entrance to exit through every reward, with distances between them
+    measured in parallel worker processes
+    :param maze:
+    :param avoid_enemies: if True, route never enters an enemy square
+    :param workers: number of processes, one per CPU if None
+    :param bonus:
+    :param penalty:
+    :return: list[int] | None
+    """
+    return collect_rewards(maze, avoid_enemies, workers, bonus, penalty)
+
+
+# solver backends by name, each returns square indices of a shortest path or None,
+# rewards returns the shortest one through every reward
+BACKENDS: dict[str, Callable[..., list[int] | None]] = {
+    "native": solve_native,
+    "weighted": solve_weighted,
+    "astar": solve_astar,
+    "bidirectional": solve_bidirectional,
+    "jump": solve_jump,
+    "tiled": solve_tiled,
+    "rewards": solve_rewards,
+    "networkx": solve_networkx,
+}
+# backends that stay exact when edges weigh less than zero, like edges into rewards
+# with a bonus larger than their distance
+NEGATIVE_BACKENDS: frozenset[str] = frozenset({"native", "weighted", "networkx"})
+
+
+def solve_all(
+    maze: Maze,
+    bonus=1,
+    penalty=2,
+    path: Path | None = None,
+    max_paths: int | None = None,
+    timeout: float | None = None,
+) -> list[Solution]:
+    """
+    Input maze instance, weight options, and limits.
+    If path of maze file is given, solutions are looked up in and saved to a solutions file next to it,
+    solutions found under a timeout are not saved since they may have been cut short.
+    Output is list of shortest solutions, empty if maze has no solution.
+    :param maze:
+    :param bonus:
+    :param penalty:
+    :param path:
+    :param max_paths: most solutions to return, all if None
+    :param timeout: seconds to spend enumerating solutions, no limit if None
+    :return: list[Solution]
+    """
+    options = {"bonus": bonus, "penalty": penalty, "max_paths": max_paths}
+    key = get_key("solve_all", "native", options)
+    if path is not None and (paths := load_solutions(path, maze.digest).get(key)) is not None:
+        return [make_solution(maze, indices) for indices in paths]
+    solutions = list(iter_solutions(maze, max_paths, timeout, bonus=bonus, penalty=penalty))
+    if path is not None and timeout is None:
+        paths = [[square.index for square in solution] for solution in solutions]
+        dump_solutions(path, maze.digest, key, paths)
+    return solutions
+
+
+def path_to_exit(maze: Maze, index: int, bonus=1, penalty=2) -> list[int] | None:
+    """
+    Input maze instance, index of square to start from, and weight options.
+    Distances to exit from every square are measured once per maze and cached,
+    after which each start only follows its path, without searching again.
+    Output is square indices of a shortest path from square to exit or None if unreachable,
+    a solution only if square is the entrance.
+    :param maze:
+    :param index:
+    :param bonus:
+    :param penalty:
+    :return: list[int] | None
+    """
+    return get_distance_field(maze, bonus=bonus, penalty=penalty).path(index)
+
+
+def shortest_paths(
+    maze: Maze, contract: bool = False, bonus=1, penalty=2
+) -> ShortestPaths:
+    """
+    Input maze instance and graph options.
+    Output is every shortest path from entrance to exit as a reusable directed acyclic graph,
+    to count, sample, or enumerate solutions without listing them all.
+    If contract, paths are over decision points, see converter.expand_path.
+    Raises exception if any edge weighs less than zero, paths are found with Dijkstra's algorithm.
+    :param maze:
+    :param contract:
+    :param bonus:
+    :param penalty:
+    :return: ShortestPaths
+    """
+    graph = get_maze_graph(maze, contract, bonus, penalty)
+    if check_weights(graph):
+        raise ValueError("Shortest paths need edges that weigh zero or more")
+    return ShortestPaths.from_graph(graph, *maze.roles.ends)
+
+
+def iter_solutions(
+    maze: Maze,
+    max_paths: int | None = None,
+    timeout: float | None = None,
+    contract: bool = False,
+    bonus=1,
+    penalty=2,
+) -> Iterator[Solution]:
+    """
+    Input maze instance, limits, and graph options.
+    Finds shortest paths once, then walks them for one solution at a time in lexicographic order,
+    so no more solutions than are used are ever created.
+    Stops after max_paths solutions, or once timeout seconds have passed since it started.
+    Output is iterator of shortest solutions.
+    :param maze:
+    :param max_paths: most solutions to yield, all if None
+    :param timeout: seconds to spend, checked before each solution, no limit if None
+    :param contract:
+    :param bonus:
+    :param penalty:
+    :return: Iterator[Solution]
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    paths = shortest_paths(maze, contract, bonus, penalty)
+    for count, indices in enumerate(paths):
+        if count == max_paths or (deadline is not None and time.monotonic() > deadline):
+            return
+        yield make_solution(maze, expand_path(maze, indices) if contract else indices)
 
 
 # test by running following commands in shell
@@ -65,7 +528,7 @@ if __name__ == "__main__":
     from src.models.role import Role
     from src.models.square import Square
     from src.view.renderer import SVGRenderer
-    maze = Maze(
+    maze = Maze.from_squares(
         squares=(
             Square(index=0, row=0, column=0, border=Border.TOP | Border.LEFT),
             Square(index=1, row=0, column=1, border=Border.TOP | Border.BOTTOM),
@@ -0,0 +1,303 @@
+# to measure tiles of one maze at once, one process per CPU
+from concurrent.futures import ProcessPoolExecutor
+# to keep frontier of search ordered by distance
+import heapq
+from itertools import repeat
+import math
+from typing import NamedTuple
+
+# to find and group squares on tile borders in vectorized sweeps over packed values
+import numpy as np
+
+from src.graphs.distance_field import DistanceField
+from src.graphs.maze_graph import IS_NODE, MazeGraph, get_edges
+from src.graphs.search import dijkstra
+from src.graphs.weight_model import get_role_costs
+from src.models.border import Border
+from src.models.maze import Maze
+
+
+class Tile(NamedTuple):
+    row: int
+    column: int
+    height: int
+    width: int
+
+    def values(self, maze: Maze) -> bytes:
+        """
+        Input maze instance
+        Output is packed values of squares inside tile, row by row
+        :param maze:
+        :return: bytes
+        """
+        cells = maze.cells.reshape(maze.height, maze.width)
+        rows = slice(self.row, self.row + self.height)
+        columns = slice(self.column, self.column + self.width)
+        return cells[rows, columns].tobytes()
+
+    def to_local(self, index: int, width: int) -> int:
+        """
+        Input square index of maze and maze width
+        Output is index of same square within tile
+        :param index:
+        :param width:
+        :return: integer
+        """
+        row, column = divmod(index, width)
+        return (row - self.row) * self.width + column - self.column
+
+    def to_global(self, index: int, width: int) -> int:
+        """
+        Input square index within tile and maze width
+        Output is index of same square within maze
+        :param index:
+        :param width:
+        :return: integer
+        """
+        row, column = divmod(index, self.width)
+        return (self.row + row) * width + self.column + column
+
+
+def tiled_search(
+    maze: Maze, tile_size: int = 8, workers: int | None = None, bonus=1, penalty=2
+) -> list[int] | None:
+    """
+    Input maze instance, size of tiles, number of worker processes, and weight options.
+    Splits maze into tiles and measures, in worker processes, distance inside each tile
+    between its portals, squares with an edge to another tile, and entrance and exit.
+    Searches the small graph of portals, then fills in path inside only the tiles it crosses.
+    Every path is a series of paths inside tiles between portals, so path is a shortest one.
+    Output is list of square indices from entrance to exit or None if unreachable.
+    :param maze:
+    :param tile_size:
+    :param workers: number of processes, one per CPU if None
+    :param bonus:
+    :param penalty:
+    :return: list[int] | None
+    """
+    source, target = maze.roles.ends
+    tiles = get_tiles(maze, tile_size)
+    crossing_sources, crossing_targets, crossing_weights = get_crossings(
+        maze, tile_size, bonus, penalty
+    )
+    portals = np.unique(np.concatenate((crossing_sources, [source, target])))
+    rows, columns = np.divmod(portals, maze.width)
+    portal_tiles = rows // tile_size * math.ceil(maze.width / tile_size) + columns // tile_size
+    # group portals by tile, members are positions in portals
+    order = np.argsort(portal_tiles, kind="stable")
+    bounds = np.searchsorted(portal_tiles[order], np.arange(len(tiles) + 1))
+    members = [order[start:end] for start, end in zip(bounds, bounds[1:])]
+    # position of each portal within its tile, the row of its distance table
+    local = np.empty(len(portals), dtype=np.int64)
+    local[order] = np.arange(len(portals)) - bounds[portal_tiles[order]]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        tables = list(executor.map(
+            measure_tile,
+            tiles,
+            (tile.values(maze) for tile in tiles),
+            ([tile.to_local(index, maze.width) for index in portals[positions].tolist()]
+             for tile, positions in zip(tiles, members)),
+            repeat(bonus),
+            repeat(penalty),
+            chunksize=max(1, len(tiles) // (8 * (workers or 1))),
+        ))
+    # edges between tiles as compressed sparse rows over portal positions
+    crossing_sources = np.searchsorted(portals, crossing_sources)
+    order = np.argsort(crossing_sources, kind="stable")
+    crossing_offsets = np.zeros(len(portals) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(crossing_sources, minlength=len(portals)), out=crossing_offsets[1:])
+    crossing_targets = np.searchsorted(portals, crossing_targets[order]).tolist()
+    crossing_weights = crossing_weights[order].tolist()
+    crossing_offsets = crossing_offsets.tolist()
+    start, goal = np.searchsorted(portals, [source, target]).tolist()
+    distances = np.full(len(portals), math.inf)
+    distances[start] = 0
+    previous: dict[int, int] = {}
+    frontier = [(0.0, start)]
+    while frontier:
+        distance, position = heapq.heappop(frontier)
+        if position == goal:
+            break
+        # skip stale frontier entries that were improved after being pushed
+        if distance > distances[position]:
+            continue
+        # every other portal of same tile at once, through its distance table
+        tile = portal_tiles[position]
+        candidates = distance + tables[tile][local[position]]
+        improved = candidates < distances[members[tile]]
+        neighbors = members[tile][improved]
+        distances[neighbors] = candidates[improved]
+        for neighbor, candidate in zip(neighbors.tolist(), candidates[improved].tolist()):
+            previous[neighbor] = position
+            heapq.heappush(frontier, (candidate, neighbor))
+        for edge in range(crossing_offsets[position], crossing_offsets[position + 1]):
+            neighbor = crossing_targets[edge]
+            if (candidate := distance + crossing_weights[edge]) < distances[neighbor]:
+                distances[neighbor] = candidate
+                previous[neighbor] = position
+                heapq.heappush(frontier, (candidate, neighbor))
+    if not math.isfinite(distances[goal]):
+        return None
+    steps = [goal]
+    while steps[-1] in previous:
+        steps.append(previous[steps[-1]])
+    steps.reverse()
+    return refine(maze, tiles, portals, portal_tiles, steps, bonus, penalty)
+
+
+def refine(
+    maze: Maze,
+    tiles: list[Tile],
+    portals: np.ndarray,
+    portal_tiles: np.ndarray,
+    steps: list[int],
+    bonus=1,
+    penalty=2,
+) -> list[int]:
+    """
+    Input maze instance, tiles, portal square indices and their tiles,
+    and positions of portals along path
+    Consecutive portals of different tiles are neighbors, consecutive portals of the same tile
+    are joined by searching a graph of only that tile
+    Output is list of square indices of every square along path
+    :param maze:
+    :param tiles:
+    :param portals:
+    :param portal_tiles:
+    :param steps:
+    :param bonus:
+    :param penalty:
+    :return: list[int]
+    """
+    path = [int(portals[steps[0]])]
+    graphs: dict[int, MazeGraph] = {}
+    for position, following in zip(steps, steps[1:]):
+        index = int(portals[following])
+        if portal_tiles[position] != portal_tiles[following]:
+            path.append(index)
+            continue
+        tile = tiles[portal_tiles[position]]
+        if (graph := graphs.get(portal_tiles[position])) is None:
+            graph = graphs[portal_tiles[position]] = make_tile_graph(
+                tile, tile.values(maze), bonus, penalty
+            )
+        inside = dijkstra(
+            graph, tile.to_local(path[-1], maze.width), tile.to_local(index, maze.width)
+        )
+        path.extend(tile.to_global(square, maze.width) for square in inside[1:])
+    return path
+
+
+def get_tiles(maze: Maze, tile_size: int) -> list[Tile]:
+    """
+    Input maze instance and width and height of tiles
+    Tiles along bottom and right edges of maze may be smaller
+    Output is list of tiles, row by row
+    :param maze:
+    :param tile_size:
+    :return: list[Tile]
+    """
+    return [
+        Tile(row, column, min(tile_size, maze.height - row), min(tile_size, maze.width - column))
+        for row in range(0, maze.height, tile_size)
+        for column in range(0, maze.width, tile_size)
+    ]
+
+
+def get_crossings(
+    maze: Maze, tile_size: int, bonus=1, penalty=2
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Input maze instance, width and height of tiles, and weight options
+    Finds edges of maze graph between squares of different tiles, in both directions,
+    edges may jump over wall and exterior squares the same way they do in MazeGraph
+    Rows are traversed one band of tiles at a time, then columns, to never hold
+    traversal arrays of the whole maze
+    Output is source indices, target indices, and edge weights
+    :param maze:
+    :param tile_size:
+    :param bonus:
+    :param penalty:
+    :return: tuple[np.ndarray, np.ndarray, np.ndarray]
+    """
+    cells = maze.cells.reshape(maze.height, maze.width)
+    found = []
+    for row in range(0, maze.height, tile_size):
+        sources, targets, distances = get_band_edges(cells[row:row + tile_size], Border.RIGHT)
+        # edges of band are within rows, keep those to another tile column
+        crossing = sources % maze.width // tile_size != targets % maze.width // tile_size
+        offset = row * maze.width
+        found.append((sources[crossing] + offset, targets[crossing] + offset, distances[crossing]))
+    for column in range(0, maze.width, tile_size):
+        band = cells[:, column:column + tile_size].T
+        sources, targets, distances = get_band_edges(band, Border.BOTTOM)
+        # edges of band are within columns, keep those to another tile row
+        crossing = sources % maze.height // tile_size != targets % maze.height // tile_size
+        found.append(tuple(
+            indices % maze.height * maze.width + column + indices // maze.height
+            for indices in (sources[crossing], targets[crossing])
+        ) + (distances[crossing],))
+    sources, targets, distances = (np.concatenate(arrays) for arrays in zip(*found))
+    sources, targets = np.concatenate((sources, targets)), np.concatenate((targets, sources))
+    distances = np.concatenate((distances, distances))
+    weights = distances + get_role_costs(bonus, penalty)[maze.cells[targets] >> 4]
+    return sources, targets, weights
+
+
+def get_band_edges(
+    band: np.ndarray, border: Border
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Input packed values of a band of lines, one line per row of array,
+    and border towards next square along a line
+    Output is source indices, target indices within band, and number of squares between them
+    :param band:
+    :param border:
+    :return: tuple[np.ndarray, np.ndarray, np.ndarray]
+    """
+    values = band.ravel()
+    order = np.arange(len(values))
+    return get_edges(
+        order, IS_NODE[values], (values & border) != 0, order % band.shape[1] == 0
+    )
+
+
+def make_tile_graph(tile: Tile, values: bytes, bonus=1, penalty=2) -> MazeGraph:
+    """
+    Input tile, packed values of its squares, and weight options
+    Tile is not a valid maze on its own, so it is trusted
+    Output is maze graph of only edges inside tile, over square indices within tile
+    :param tile:
+    :param values:
+    :param bonus:
+    :param penalty:
+    :return: MazeGraph
+    """
+    maze = Maze(tile.width, tile.height, values, trusted=True)
+    return MazeGraph.from_maze(maze, bonus=bonus, penalty=penalty)
+
+
+def measure_tile(
+    tile: Tile, values: bytes, portals: list[int], bonus=1, penalty=2
+) -> np.ndarray:
+    """
+    Input tile, packed values of its squares, square indices of portals within tile,
+    and weight options, run in worker processes of tiled_search
+    Searches once per portal with Dijkstra's algorithm over the graph of only that tile,
+    so work grows with portals times squares of the tile, not with every pair of squares
+    Output is table of distance from each portal to every portal inside tile,
+    infinite if unreachable
+    :param tile:
+    :param values:
+    :param portals:
+    :param bonus:
+    :param penalty:
+    :return: np.ndarray
+    """
+    if not portals:
+        return np.empty((0, 0))
+    graph = make_tile_graph(tile, values, bonus, penalty)
+    # a field towards one portal holds distance to it from every portal, one column of table
+    return np.column_stack(
+        [DistanceField.from_graph(graph, (portal,)).distances[portals] for portal in portals]
+    )
@@ -0,0 +1,155 @@
+# parent to data classes that are expected by only contain and modify their own data
+from dataclasses import dataclass
+# to cache method results to avoid recalculations when recalled
+from functools import cached_property
+# to digest cost maps into a key for caches
+import hashlib
+
+# to weigh every edge at once in vectorized gathers over packed values
+import numpy as np
+
+from src.graphs.converter import role_weight
+from src.models.maze import Maze
+from src.models.role import Role
+
+
+@dataclass(frozen=True, eq=False)
+class WeightModel:
+    """
+    Immutable dataclass of what entering a square adds to the distance of an edge
+    role_costs has one cost per role nibble, cell_costs, if given, one more cost per square index
+    Weight of every edge of a graph is looked up at once from the squares edges enter,
+    so one graph topology is weighed by any number of models without being built again
+    """
+    role_costs: tuple[float, ...]
+    cell_costs: np.ndarray | None = None
+
+    def __post_init__(self) -> None:
+        """
+        Post initialization tests to verify that there is a cost for every role nibble
+        :return: None
+        """
+        if len(self.role_costs) != 16:
+            raise ValueError(f"Expected 16 role costs, got {len(self.role_costs)}")
+
+    @classmethod
+    def from_options(cls, bonus=1, penalty=2) -> "WeightModel":
+        """
+        Input weight options
+        Output is weight model of converter.role_weight, rewards cost less and enemies more
+        :param bonus:
+        :param penalty:
+        :return: WeightModel
+        """
+        return cls(tuple(get_role_costs(bonus, penalty).tolist()))
+
+    @classmethod
+    def from_roles(
+        cls, costs: dict[Role, float], cell_costs: np.ndarray | None = None
+    ) -> "WeightModel":
+        """
+        Input cost of entering squares of each role, roles left out cost nothing,
+        and optional cost of entering each square by square index
+        Output is weight model
+        :param costs:
+        :param cell_costs:
+        :return: WeightModel
+        """
+        role_costs = [0.0] * 16
+        for role, cost in costs.items():
+            role_costs[role] = cost
+        if cell_costs is not None:
+            cell_costs = np.asarray(cell_costs, dtype=np.float32).ravel()
+        return cls(tuple(role_costs), cell_costs)
+
+    @cached_property
+    def key(self) -> tuple:
+        """
+        Returns hashable key of costs for caches, cost maps are keyed by their digest
+        :return: tuple
+        """
+        if self.cell_costs is None:
+            return self.role_costs, None
+        digest = hashlib.blake2b(self.cell_costs.tobytes(), digest_size=16).hexdigest()
+        return self.role_costs, digest
+
+    def __str__(self) -> str:
+        """
+        Returns costs in short form, for keys of cached solutions
+        :return: string
+        """
+        role_costs, digest = self.key
+        return f"{type(self).__name__}({role_costs}, {digest})"
+
+    def apply(
+        self, maze: Maze, sources: np.ndarray, targets: np.ndarray, distances: np.ndarray
+    ) -> np.ndarray:
+        """
+        Input maze instance, and source and target square index and distance of every edge
+        An edge enters every square after its source up to and including its target,
+        edges of contracted graphs run along whole corridors, wall and exterior squares
+        they jump over are never entered
+        Output is weight of every edge, its distance plus costs of every square it enters
+        :param maze:
+        :param sources:
+        :param targets:
+        :param distances:
+        :return: np.ndarray
+        """
+        cells = maze.cells
+        costs = np.array(self.role_costs)[cells >> 4]
+        if self.cell_costs is not None:
+            if len(self.cell_costs) != len(cells):
+                raise ValueError(
+                    f"Expected {len(cells)} cell costs, got {len(self.cell_costs)}"
+                )
+            costs = costs + self.cell_costs
+        roles = cells >> 4
+        costs[(roles == Role.EXTERIOR) | (roles == Role.WALL)] = 0
+        weights = distances + get_run_costs(costs, maze.width, sources, targets)
+        return weights.astype(np.float32)
+
+
+def get_role_costs(bonus=1, penalty=2) -> np.ndarray:
+    """
+    Input weight options.
+    Output is what entering a square adds to an edge, by role nibble, see converter.role_weight.
+    :param bonus:
+    :param penalty:
+    :return: np.ndarray
+    """
+    return np.array([role_weight(0, role, bonus, penalty) for role in range(16)])
+
+
+def get_run_costs(
+    costs: np.ndarray, width: int, sources: np.ndarray, targets: np.ndarray
+) -> np.ndarray:
+    """
+    Input cost of entering each square by square index, maze width,
+    and source and target square index of every edge, edges run along a row or a column
+    Squares of a row are consecutive by square index and squares of a column
+    in column by column order, so squares of each edge are one slice summed at once
+    Output is sum of costs of squares after source up to and including target, of every edge
+    :param costs:
+    :param width:
+    :param sources:
+    :param targets:
+    :return: np.ndarray
+    """
+    height = len(costs) // width
+    run_costs = np.zeros(len(targets))
+    across = sources // width == targets // width
+    squares = np.arange(len(costs))
+    for edges, order in ((across, squares), (~across, squares.reshape(height, width).T.ravel())):
+        if not edges.any():
+            continue
+        positions = np.empty_like(order)
+        positions[order] = squares
+        start, end = positions[sources[edges]], positions[targets[edges]]
+        forward = start < end
+        # slices of squares entered, by position in order, one zero past the end to close them
+        bounds = np.column_stack(
+            (np.where(forward, start + 1, end), np.where(forward, end + 1, start))
+        )
+        run_costs[edges] = np.add.reduceat(np.append(costs[order], 0), bounds.ravel())[::2]
+    return run_costs
@@ -0,0 +1,16 @@
+# lookup tables of every border nibble, so hot loops index a tuple instead of doing enum arithmetic
+from src.models.border import Border
+
+# border bits as plain integers, masking a packed value with these never creates a Border
+TOP: int = Border.TOP.value
+LEFT: int = Border.LEFT.value
+BOTTOM: int = Border.BOTTOM.value
+RIGHT: int = Border.RIGHT.value
+
+# border bit by name, same names as Border members
+BITS: dict[str, int] = {"TOP": TOP, "LEFT": LEFT, "BOTTOM": BOTTOM, "RIGHT": RIGHT}
+
+# indexed by border nibble, the low nibble of a packed value
+NIBBLES = range(16)
+# Border member of each nibble, same as Border(nibble) without going through enum lookup
+BORDERS: tuple[Border, ...] = tuple(Border(nibble) for nibble in NIBBLES)
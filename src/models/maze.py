@@ -1,35 +1,81 @@
 # parent to data classes that are expected by only contain and modify their own data
-from dataclasses import dataclass
+from dataclasses import InitVar, dataclass, field
 # to cache method results to avoid recalculations when recalled
 from functools import cached_property
+# to digest packed values into a key for caches
+import hashlib
 # type hints for iterator
-from typing import Iterator
+from typing import Iterable, Iterator
 from pathlib import Path
 
+# to validate packed square values in vectorized sweeps
+import numpy as np
+
 from src.models.role import Role
+from src.models.role_index import RoleIndex
 from src.models.square import Square
 from src.persistence.serializer import (
-    dump_squares,
-    load_squares,
+    compress,
+    decompress,
+    dump_values,
+    load_values,
+    map_values,
 )
 
 
 @dataclass(frozen=True)
 class Maze:
     """
-    Immutable dataclass representing maze as tuple of squares
+    Immutable dataclass representing maze as packed grid of square values
+    Each square is one byte, role in the high nibble and border in the low nibble
+    Squares are only created when the maze is indexed or iterated
+    Pass trusted=True to skip validation of values already known to be valid
+    Role index is given by whoever creates the maze, otherwise found on first use
+    Values are bytes, or a read-only memoryview when the maze is memory mapped
+    Pass interned=True to keep every square created, so the same square is always the same object
     """
-    squares: tuple[Square, ...]
+    width: int
+    height: int
+    values: bytes | memoryview
+    role_index: RoleIndex | None = field(default=None, compare=False, repr=False)
+    trusted: InitVar[bool] = False
+    interned: bool = field(default=False, compare=False, repr=False)
 
     @classmethod
-    def load(cls, path: Path) -> "Maze":
+    def from_squares(cls, squares: Iterable[Square]) -> "Maze":
+        """
+        Input squares in index order
+        Output is a maze instance with squares packed into one byte each
+        :param squares:
+        :return: Maze
+        """
+        width, values, role_index = pack_squares(squares)
+        return cls(width, len(values) // width, values, role_index)
+
+    @classmethod
+    def load(cls, path: Path, trusted: bool = False) -> "Maze":
         """
         Input file path
         Output is a maze instance with data from binary maze file
+        Pass trusted=True to skip validation for files written by dump
+        :param path:
+        :param trusted:
+        :return: Maze
+        """
+        return Maze(*load_values(path), trusted=trusted)
+
+    @classmethod
+    def open_mmap(cls, path: Path, trusted: bool = True) -> "Maze":
+        """
+        Input file path
+        Output is a maze instance backed by a memory mapped view of binary maze file body
+        Opening takes constant time, only pages of squares that are accessed are read from disk
+        Not validated unless trusted=False, which reads every page once
         :param path:
+        :param trusted:
         :return: Maze
         """
-        return Maze(tuple(load_squares(path)))
+        return Maze(*map_values(path), trusted=trusted)
 
     def dump(self, path: Path) -> None:
         """
@@ -38,27 +84,23 @@ class Maze:
         :param path:
         :return:
         """
-        dump_squares(self.width, self.height, self.squares, path)
+        dump_values(self.width, self.height, self.values, path)
 
-    def __post_init__(self) -> None:
+    def __post_init__(self, trusted: bool) -> None:
         """
         Post initialization checks if maze is valid
+        Skipped if values are trusted
         """
-        # if all square have valid index values
-        validate_indices(self)
-        # if all squares have valid row and column values
-        validate_rows_columns(self)
-        # if there is exactly one square with an entrance role per maze
-        validate_entrance(self)
-        # if there is exactly one square with an exit role per maze
-        validate_exit(self)
+        if not trusted:
+            validate(self)
 
     def __iter__(self) -> Iterator[Square]:
         """
         Transform maze into an iterable
+        Squares are created one at a time from the packed values
         :return: iterator
         """
-        return iter(self.squares)
+        return map(self.__getitem__, range(len(self.values)))
 
     def __getitem__(self, index: int) -> Square:
         """
@@ -66,87 +108,162 @@ class Maze:
         :param index:
         :return:
         """
-        return self.squares[index]
+        # range handles negative indices and raises IndexError when out of bounds
+        index = range(len(self.values))[index]
+        if not self.interned:
+            return self.make_square(index)
+        # flyweight table, squares are created once on first use and shared after
+        if (square := self.flyweights[index]) is None:
+            square = self.flyweights[index] = self.make_square(index)
+        return square
+
+    def make_square(self, index: int) -> Square:
+        """
+        Input index and return new square at that index from packed value
+        :param index:
+        :return: Square
+        """
+        row, column = divmod(index, self.width)
+        border, role = decompress(self.values[index])
+        return Square(index, row, column, border, role)
 
     @cached_property
-    def width(self):
+    def flyweights(self) -> list[Square | None]:
+        """
+        Returns table of squares of an interned maze by index, None until first used
+        :return: list[Square | None]
         """
-        Returns max width of maze
+        return [None] * len(self.values)
+
+    def __len__(self) -> int:
+        """
+        Return number of squares in maze
         :return: integer
         """
-        return max(square.column for square in self) + 1
+        return len(self.values)
+
+    @property
+    def cells(self) -> np.ndarray:
+        """
+        Returns packed square values as a read-only numpy array without copying
+        :return: numpy array of unsigned bytes
+        """
+        return np.frombuffer(self.values, dtype=np.uint8)
+
+    @property
+    def squares(self) -> tuple[Square, ...]:
+        """
+        Returns every square of maze
+        Materializes one square instance per cell, avoid on large mazes
+        :return: tuple[Square, ...]
+        """
+        return tuple(self)
 
     @cached_property
-    def height(self):
+    def digest(self) -> str:
         """
-        Returns max height of maze
-        :return: integer
+        Returns hex digest of maze dimensions and packed values
+        Mazes with the same squares have the same digest
+        :return: string
         """
-        return max(square.row for square in self) + 1
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(self.width.to_bytes(4, "little"))
+        digest.update(self.height.to_bytes(4, "little"))
+        digest.update(self.values)
+        return digest.hexdigest()
+
+    @cached_property
+    def roles(self) -> RoleIndex:
+        """
+        Returns indices of entrance, exit, enemy, and reward squares
+        Scans packed values only if no role index was given at creation
+        :return: RoleIndex
+        """
+        if self.role_index is not None:
+            return self.role_index
+        return RoleIndex.scan(self.values)
+
+    def role(self, index: int) -> Role:
+        """
+        Input index and return role of square at that index without creating the square
+        :param index:
+        :return: Role
+        """
+        return Role(self.values[index] >> 4)
 
     @cached_property
     def entrance(self) -> Square:
         """
         Returns entrance from maze
+        Raises exception if maze has no entrance, trusted mazes are never checked for one
         :return: Square
         """
-        return next(sq for sq in self if sq.role is Role.ENTRANCE)
+        if self.roles.entrance is None:
+            raise ValueError("Maze has no entrance")
+        return self[self.roles.entrance]
 
     @cached_property
     def exit(self) -> Square:
         """
         Returns exit from maze
+        Raises exception if maze has no exit, trusted mazes are never checked for one
         :return: Square
         """
-        return next(sq for sq in self if sq.role is Role.EXIT)
+        if self.roles.exit is None:
+            raise ValueError("Maze has no exit")
+        return self[self.roles.exit]
 
 
-def validate_indices(maze: Maze) -> None:
+def pack_squares(squares: Iterable[Square]) -> tuple[int, bytes, RoleIndex]:
     """
-    Raises exception if any square index from maze is not valid or in proper order
-    :param maze:
-    :return: None
+    Input squares in index order
+    Checks index, row, and column of every square in a single pass while packing
+    Raises exception if any square is not valid or in proper order
+    Output is maze width, packed square values, and role index
+    :param squares:
+    :return: tuple[int, bytes, RoleIndex]
     """
-    assert [square.index for square in maze] == list(
-        range(len(maze.squares))
-    ), "Wrong square.index"
+    values = bytearray()
+    # indices of squares with any role, to build role index without another pass
+    role_indices: list[int] = []
+    # width is unknown until the first square of the second row
+    width = None
+    for index, square in enumerate(squares):
+        assert square.index == index, "Wrong square.index"
+        if width is None and square.row:
+            width = index
+        row, column = divmod(index, width) if width else (0, index)
+        assert square.row == row, "Wrong square.row"
+        assert square.column == column, "Wrong square.column"
+        values.append(compress(square))
+        if square.role is not Role.NONE:
+            role_indices.append(index)
+    # a maze with a single row never found a second row
+    width = width or len(values)
+    assert width and len(values) % width == 0, "Wrong number of squares"
+    role_index = RoleIndex.from_roles(
+        role_indices, (values[index] >> 4 for index in role_indices)
+    )
+    return width, bytes(values), role_index
 
 
-def validate_rows_columns(maze: Maze) -> None:
+def validate(maze: Maze) -> None:
     """
-    Raises exception if any square row or column values from maze are not valid or in proper oder
+    Raises exception if maze is not valid
+    Checks size, roles, entrance, and exit in one vectorized sweep over packed values
     :param maze:
     :return: None
     """
-    for y in range(0, maze.height):
-        for x in range(0, maze.width):
-            index = y * maze.width + x
-            square = maze[index]
-            assert square.row == y, "Wrong square.row"
-            assert square.column == x, "Wrong square.column"
-
-
-def validate_entrance(maze: Maze) -> None:
-    """
-    Raises exception if maze doesn't have exactly one entrance
-    :param maze:
-    :return: None
-    """
-    assert 1 == sum(
-        1 for square in maze if square.role is Role.ENTRANCE
-    ), "Must be exactly one entrance"
-
-
-def validate_exit(maze: Maze) -> None:
-    """
-    Raises exception if maze doesn't have exactly one exit
-    :param maze:
-    :return: None
-    """
-    assert 1 == sum(
-        1 for square in maze if square.role is Role.EXIT
-    ), "Must be exactly one exit"
-
+    # if there is one packed value for every square of the grid
+    assert len(maze.values) == maze.width * maze.height, "Wrong number of squares"
+    # count squares of every role at once, role is the high nibble of each value
+    counts = np.bincount(maze.cells >> 4, minlength=16)
+    # if every role nibble is a known role
+    assert not counts[len(Role):].any(), "Unknown square role"
+    # if there is exactly one square with an entrance role per maze
+    assert counts[Role.ENTRANCE] == 1, "Must be exactly one entrance"
+    # if there is exactly one square with an exit role per maze
+    assert counts[Role.EXIT] == 1, "Must be exactly one exit"
 
 
 # run the following in shell to test proper functionality
@@ -159,7 +276,7 @@ def validate_exit(maze: Maze) -> None:
 # if __name__=="__main__":
 #     from src.models.border import Border
 #     from src.view.renderer import SVGRenderer
-#     maze = Maze(
+#     maze = Maze.from_squares(
 #          squares=(
 #              Square(0, 0, 0, Border.TOP | Border.LEFT),
 #              Square(1, 0, 1, Border.TOP | Border.RIGHT),
@@ -0,0 +1,73 @@
+# parent to data classes that are expected by only contain and modify their own data
+from dataclasses import dataclass
+# type hints for iterable
+from typing import Iterable
+
+# to find role squares in a vectorized sweep over packed values
+import numpy as np
+
+from src.models.role import Role
+
+# roles whose square indices are kept, every other role is left out of the index
+INDEXED_ROLES: tuple[Role, ...] = (Role.ENTRANCE, Role.EXIT, Role.ENEMY, Role.REWARD)
+
+# lookup table from role nibble to whether the role is indexed
+IS_INDEXED = np.isin(np.arange(16), INDEXED_ROLES)
+
+
+@dataclass(frozen=True)
+class RoleIndex:
+    """
+    Immutable dataclass of square indices for roles that matter to solving
+    Built once when a maze is created or loaded so lookups never scan the maze
+    Entrance and exit are None if the maze has none, see ends
+    """
+    entrance: int | None
+    exit: int | None
+    enemies: tuple[int, ...] = ()
+    rewards: tuple[int, ...] = ()
+
+    @classmethod
+    def from_roles(cls, indices: Iterable[int], roles: Iterable[int]) -> "RoleIndex":
+        """
+        Input square indices and the role of each of those squares
+        Output is role index of entrance, exit, enemy, and reward squares
+        :param indices:
+        :param roles:
+        :return: RoleIndex
+        """
+        positions: dict[int, list[int]] = {role: [] for role in INDEXED_ROLES}
+        for index, role in zip(indices, roles):
+            if role in positions:
+                positions[role].append(index)
+        return cls(
+            entrance=next(iter(positions[Role.ENTRANCE]), None),
+            exit=next(iter(positions[Role.EXIT]), None),
+            enemies=tuple(positions[Role.ENEMY]),
+            rewards=tuple(positions[Role.REWARD]),
+        )
+
+    @classmethod
+    def scan(cls, values: bytes) -> "RoleIndex":
+        """
+        Input packed square values
+        Finds every indexed role square in one vectorized sweep
+        :param values:
+        :return: RoleIndex
+        """
+        roles = np.frombuffer(values, dtype=np.uint8) >> 4
+        indices = np.flatnonzero(IS_INDEXED[roles])
+        return cls.from_roles(indices.tolist(), roles[indices].tolist())
+
+    @property
+    def ends(self) -> tuple[int, int]:
+        """
+        Returns square indices of entrance and exit, where every path starts and ends
+        Raises exception if maze has no entrance or no exit
+        :return: tuple[int, int]
+        """
+        if self.entrance is None:
+            raise ValueError("Maze has no entrance")
+        if self.exit is None:
+            raise ValueError("Maze has no exit")
+        return self.entrance, self.exit
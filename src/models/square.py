@@ -5,14 +5,23 @@ from src.models.border import Border
 from src.models.role import Role
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Square:
     """
     Immutable dataclass containing all square information
     index, row, column, border, and role
+    Slotted to hold no dictionary per square, and hashed by index alone,
+    squares of one maze never share an index
     """
     index: int
     row: int
     column: int
     border: Border
     role: Role = Role.NONE
+
+    def __hash__(self) -> int:
+        """
+        Return hash of square, its index
+        :return: integer
+        """
+        return self.index
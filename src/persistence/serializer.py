@@ -1,9 +1,13 @@
 import array
+# to map file body into memory without reading it
+import mmap
 import pathlib
-from typing import Iterator
+from typing import BinaryIO, Iterator
 
 from src.models.border import Border
+from src.models.border_table import BORDERS
 from src.models.role import Role
+from src.models.role_index import RoleIndex
 from src.models.square import Square
 from src.persistence.file_format import FileBody, FileHeader
 
@@ -32,6 +36,27 @@ def dump_squares(
         body.write(file)
 
 
+def dump_values(
+    width: int,
+    height: int,
+    values: bytes,
+    path: pathlib.Path,
+) -> None:
+    """
+    Input maze width, height, packed square values, and file path with filename to write binary file
+    Values are written as they are, no square instances are created
+    :param width:
+    :param height:
+    :param values:
+    :param path:
+    :return: None
+    """
+    header = FileHeader(FORMAT_VERSION, width, height)
+    with path.open(mode="wb") as file:
+        header.write(file)
+        file.write(values)
+
+
 def serialize(
     width: int, height: int, squares: tuple[Square, ...]
 ) -> tuple[FileHeader, FileBody]:
@@ -58,19 +83,78 @@ def compress(square: Square) -> int:
 
 def load_squares(path: pathlib.Path) -> Iterator[Square]:
     """
+    Input file path
+    Output is iterator generator of squares from binary maze file
+    :param path:
+    :return: Iterator
+    """
+    return deserialize(*load(path))
 
+
+def load_values(path: pathlib.Path) -> tuple[int, int, bytes, RoleIndex]:
+    """
+    Input file path
+    Output is maze width, height, packed square values, and role index from binary maze file
+    Role squares are indexed while the body is in hand so a maze never has to scan for them
     :param path:
-    :return:
+    :return: tuple[int, int, bytes, RoleIndex]
+    """
+    header, body = load(path)
+    values = body.square_values.tobytes()
+    return header.width, header.height, values, RoleIndex.scan(values)
+
+
+def map_values(path: pathlib.Path) -> tuple[int, int, memoryview]:
+    """
+    Input file path
+    Output is maze width, height, and read-only view of packed square values from binary maze file
+    File body is memory mapped, nothing is read until a value is accessed
+    :param path:
+    :return: tuple[int, int, memoryview]
+    """
+    with path.open("rb") as file:
+        header = read_header(file)
+        # remember pointer is currently pointing after header
+        offset = file.tell()
+        # map whole file since a mapping has to start on a page boundary, mapping outlives the file
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    size = header.width * header.height
+    # if file ends before every square, raise exception
+    if len(mapped) - offset < size:
+        raise ValueError("Truncated file body")
+    return header.width, header.height, memoryview(mapped)[offset:offset + size]
+
+
+def load(path: pathlib.Path) -> tuple[FileHeader, FileBody]:
+    """
+    Input file path
+    Output is header and body instances from binary maze file
+    :param path:
+    :return: tuple[FileHeader, FileBody]
     """
     with path.open("rb") as file:
-        # extract header from file
-        header = FileHeader.read(file)
-        # if not valid header format version, raise exception
-        if header.format_version != FORMAT_VERSION:
-            raise ValueError("Unsupported file format version")
+        header = read_header(file)
         # extract body from rest of file, remember pointer is currently pointing after header
         body = FileBody.read(header, file)
-        return deserialize(header, body)
+        # if file ends before every square was read, raise exception
+        if len(body.square_values) != header.width * header.height:
+            raise ValueError("Truncated file body")
+        return header, body
+
+
+def read_header(file: BinaryIO) -> FileHeader:
+    """
+    Input binary maze file
+    Output is header instance, raises exception if format version is not supported
+    :param file:
+    :return: FileHeader
+    """
+    # extract header from file
+    header = FileHeader.read(file)
+    # if not valid header format version, raise exception
+    if header.format_version != FORMAT_VERSION:
+        raise ValueError("Unsupported file format version")
+    return header
 
 
 def deserialize(header: FileHeader, body: FileBody) -> Iterator[Square]:
@@ -94,9 +178,9 @@ def decompress(square_value: int) -> tuple[Border, Role]:
     :param square_value:
     :return:
     """
-    # retrieve border value and create new border instance with it to return
+    # look up border instance of low nibble to return
     # shift input and use remainder to create instance of role to return
-    return Border(square_value & 0xF), Role(square_value >> 4)
+    return BORDERS[square_value & 0xF], Role(square_value >> 4)
 
 
 # to test run the following in a shell
@@ -108,7 +192,7 @@ def decompress(square_value: int) -> tuple[Border, Role]:
 # from src.maze_solver.models.square import Square
 # from src.maze_solver.persistence.serializer import dump_squares, load_squares
 #
-# maze = Maze(
+# maze = Maze.from_squares(
 #     squares=(
 #         Square(0, 0, 0, Border.TOP | Border.LEFT),
 #         Square(1, 0, 1, Border.TOP | Border.RIGHT),
@@ -127,6 +211,6 @@ def decompress(square_value: int) -> tuple[Border, Role]:
 #
 # path = Path("miniature.maze")
 #
-# dump_squares(maze.width, maze.height, maze.squares, path)
+# dump_values(maze.width, maze.height, maze.values, path)
 # load_squares(path) == maze
 # load_squares(path) is maze
\ No newline at end of file
@@ -0,0 +1,159 @@
+import array
+import pathlib
+# to convert content into c struct binary types
+import struct
+# to store index lists little-endian whatever byte order of machine
+import sys
+from dataclasses import dataclass, field
+# for type hinting binary input or output
+from typing import BinaryIO
+
+# distinct from maze files, which start with b"MAZE"
+MAGIC_NUMBER: bytes = b"MSOL"
+FORMAT_VERSION: int = 1
+# maze digests are 16 bytes, see Maze.digest
+DIGEST_SIZE: int = 16
+
+
+@dataclass(frozen=True)
+class SolutionsFile:
+    """
+    Immutable data-class of cached solutions stored next to a maze file
+    Solutions are lists of square indices, grouped by key of solver parameters,
+    and belong to the maze with digest, any other maze ignores them
+    """
+    digest: str
+    solutions: dict[str, list[list[int]]] = field(default_factory=dict)
+
+    @classmethod
+    def read(cls, file: BinaryIO) -> "SolutionsFile":
+        """
+        Input binary solutions file
+        Creates and returns instance of SolutionsFile from file content
+        Raises ValueError if file is not a solutions file or is cut short
+        :param file:
+        :return: SolutionsFile
+        """
+        if file.read(len(MAGIC_NUMBER)) != MAGIC_NUMBER:
+            raise ValueError("Unknown file type")
+        (format_version,) = struct.unpack("B", read_exactly(file, 1))
+        if format_version != FORMAT_VERSION:
+            raise ValueError("Unsupported file format version")
+        digest = read_exactly(file, DIGEST_SIZE).hex()
+        solutions = {}
+        while key_length := file.read(2):
+            (key_length,) = struct.unpack("<H", key_length)
+            key = read_exactly(file, key_length).decode("utf-8")
+            (count,) = struct.unpack("<I", read_exactly(file, 4))
+            solutions[key] = [read_indices(file) for _ in range(count)]
+        return cls(digest, solutions)
+
+    def write(self, file: BinaryIO) -> None:
+        """
+        Input file name to write solutions file
+        :param file:
+        :return: None
+        """
+        file.write(MAGIC_NUMBER)
+        file.write(struct.pack("B", FORMAT_VERSION))
+        file.write(bytes.fromhex(self.digest))
+        for key, paths in self.solutions.items():
+            key_bytes = key.encode("utf-8")
+            # <: little-endian byte order, H: 16-bit and I: 32-bit unsigned integer types
+            file.write(struct.pack("<H", len(key_bytes)))
+            file.write(key_bytes)
+            file.write(struct.pack("<I", len(paths)))
+            for path in paths:
+                write_indices(file, path)
+
+
+def read_exactly(file: BinaryIO, size: int) -> bytes:
+    """
+    Input file and number of bytes
+    Raises ValueError if file ends first
+    :param file:
+    :param size:
+    :return: bytes
+    """
+    content = file.read(size)
+    if len(content) != size:
+        raise ValueError("Truncated solutions file")
+    return content
+
+
+def read_indices(file: BinaryIO) -> list[int]:
+    """
+    Input file with pointer at a stored index list
+    Output is list of square indices
+    :param file:
+    :return: list[int]
+    """
+    (length,) = struct.unpack("<I", read_exactly(file, 4))
+    indices = array.array("I", read_exactly(file, 4 * length))
+    # stored little-endian, array uses byte order of machine
+    if sys.byteorder == "big":
+        indices.byteswap()
+    return indices.tolist()
+
+
+def write_indices(file: BinaryIO, indices: list[int]) -> None:
+    """
+    Input file and list of square indices
+    Writes length followed by indices as 32-bit unsigned integers
+    :param file:
+    :param indices:
+    :return: None
+    """
+    file.write(struct.pack("<I", len(indices)))
+    values = array.array("I", indices)
+    if sys.byteorder == "big":
+        values.byteswap()
+    file.write(values.tobytes())
+
+
+def get_solutions_path(maze_path: pathlib.Path) -> pathlib.Path:
+    """
+    Input path of maze file
+    Output is path of solutions file next to it
+    :param maze_path:
+    :return: pathlib.Path
+    """
+    return maze_path.with_suffix(".solutions")
+
+
+def load_solutions(maze_path: pathlib.Path, digest: str) -> dict[str, list[list[int]]]:
+    """
+    Input path of maze file and digest of maze
+    Output is cached solutions by key, empty if none are cached,
+    file can't be read, or solutions were for a maze with different squares
+    :param maze_path:
+    :param digest:
+    :return: dict[str, list[list[int]]]
+    """
+    try:
+        with get_solutions_path(maze_path).open("rb") as file:
+            cached = SolutionsFile.read(file)
+    except (OSError, ValueError):
+        return {}
+    return cached.solutions if cached.digest == digest else {}
+
+
+def dump_solutions(
+    maze_path: pathlib.Path, digest: str, key: str, paths: list[list[int]]
+) -> None:
+    """
+    Input path of maze file, digest of maze, key of solver parameters, and solutions
+    Adds solutions to cached ones of same maze, replacing solutions of any other maze
+    File is replaced in one step so readers never see it half written
+    :param maze_path:
+    :param digest:
+    :param key:
+    :param paths:
+    :return: None
+    """
+    solutions = load_solutions(maze_path, digest) | {key: paths}
+    path = get_solutions_path(maze_path)
+    temporary = path.with_suffix(".solutions.tmp")
+    with temporary.open(mode="wb") as file:
+        SolutionsFile(digest, solutions).write(file)
+    temporary.replace(path)
@@ -1,4 +1,5 @@
 from src.models.border import Border
+from src.models.border_table import BOTTOM, LEFT, RIGHT, TOP
 from src.view.primitives import (
     DisjointLines,
     Line,
@@ -10,7 +11,7 @@ from src.view.primitives import (
 )
 
 
-def decompose(border: Border, top_left: Point, square_size: int) -> Primitive:
+def decompose(border: Border | int, top_left: Point, square_size: int) -> Primitive:
     """
     Will return instance of square shape based on square border
     :param border:
@@ -31,7 +32,7 @@ def decompose(border: Border, top_left: Point, square_size: int) -> Primitive:
     right = Line(top_right, bottom_right)
 
     # if border on 4 sides make Polygon and return instance
-    if border is Border.LEFT | Border.TOP | Border.RIGHT | Border.BOTTOM:
+    if border == LEFT | TOP | RIGHT | BOTTOM:
         return Polygon(
             [
                 top_left,
@@ -41,7 +42,7 @@ def decompose(border: Border, top_left: Point, square_size: int) -> Primitive:
             ]
         )
     # if border on 3 sides make Polyline and return instance
-    if border is Border.BOTTOM | Border.LEFT | Border.TOP:
+    if border == BOTTOM | LEFT | TOP:
         return Polyline(
             [
                 bottom_right,
@@ -51,7 +52,7 @@ def decompose(border: Border, top_left: Point, square_size: int) -> Primitive:
             ]
         )
     # if border on 3 sides make Polyline and return instance
-    if border is Border.LEFT | Border.TOP | Border.RIGHT:
+    if border == LEFT | TOP | RIGHT:
         return Polyline(
             [
                 bottom_left,
@@ -61,7 +62,7 @@ def decompose(border: Border, top_left: Point, square_size: int) -> Primitive:
             ]
         )
     # if border on 3 sides make Polyline and return instance
-    if border is Border.TOP | Border.RIGHT | Border.BOTTOM:
+    if border == TOP | RIGHT | BOTTOM:
         return Polyline(
             [
                 top_left,
@@ -71,7 +72,7 @@ def decompose(border: Border, top_left: Point, square_size: int) -> Primitive:
             ]
         )
     # if border on 3 sides make Polyline and return instance
-    if border is Border.RIGHT | Border.BOTTOM | Border.LEFT:
+    if border == RIGHT | BOTTOM | LEFT:
         return Polyline(
             [
                 top_right,
@@ -81,7 +82,7 @@ def decompose(border: Border, top_left: Point, square_size: int) -> Primitive:
             ]
         )
     # if border on 2 adjacent sides make Polyline and return instance
-    if border is Border.LEFT | Border.TOP:
+    if border == LEFT | TOP:
         return Polyline(
             [
                 bottom_left,
@@ -90,7 +91,7 @@ def decompose(border: Border, top_left: Point, square_size: int) -> Primitive:
             ]
         )
     # if border on 2 adjacent sides make Polyline and return instance
-    if border is Border.TOP | Border.RIGHT:
+    if border == TOP | RIGHT:
         return Polyline(
             [
                 top_left,
@@ -99,7 +100,7 @@ def decompose(border: Border, top_left: Point, square_size: int) -> Primitive:
             ]
         )
     # if border on 2 adjacent sides make Polyline and return instance
-    if border is Border.BOTTOM | Border.LEFT:
+    if border == BOTTOM | LEFT:
         return Polyline(
             [
                 bottom_right,
@@ -108,7 +109,7 @@ def decompose(border: Border, top_left: Point, square_size: int) -> Primitive:
             ]
         )
     # if border on 2 adjacent sides make Polyline and return instance
-    if border is Border.RIGHT | Border.BOTTOM:
+    if border == RIGHT | BOTTOM:
         return Polyline(
             [
                 top_right,
@@ -117,22 +118,22 @@ def decompose(border: Border, top_left: Point, square_size: int) -> Primitive:
             ]
         )
     # if border on 2 non-adjacent sides make DisjointLines and return instance
-    if border is Border.LEFT | Border.RIGHT:
+    if border == LEFT | RIGHT:
         return DisjointLines([left, right])
     # if border on 2 non-adjacent sides make DisjointLines and return instance
-    if border is Border.TOP | Border.BOTTOM:
+    if border == TOP | BOTTOM:
         return DisjointLines([top, bottom])
     # if border on one side return line that was created above
-    if border is Border.TOP:
+    if border == TOP:
         return top
     # if border on one side return line that was created above
-    if border is Border.RIGHT:
+    if border == RIGHT:
         return right
     # if border on one side return line that was created above
-    if border is Border.BOTTOM:
+    if border == BOTTOM:
         return bottom
     # if border on one side return line that was created above
-    if border is Border.LEFT:
+    if border == LEFT:
         return left
     # if no borders return Null object that still has draw method
     return NullPrimitive()
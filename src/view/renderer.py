@@ -272,7 +272,7 @@ def label(emoji: str, top_left: Point, offset: int) -> str:
 # from src.models.solution import Solution
 # from src.models.square import Square
 # #
-# maze = Maze(
+# maze = Maze.from_squares(
 #     squares=(
 #         Square(0, 0, 0, Border.TOP | Border.LEFT),
 #         Square(1, 0, 1, Border.TOP | Border.RIGHT),
@@ -0,0 +1,452 @@
+from pathlib import Path
+import heapq
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from src.generate.convert_api_maze import string_to_maze
+from src.graphs.cache import (
+    GRAPH_CACHE,
+    GraphCache,
+    get_distance_field,
+    get_maze_graph,
+    get_weighted_graph,
+)
+from src.graphs.components import label_components
+from src.graphs.converter import make_graph
+from src.graphs.incremental import IncrementalSolver
+from src.graphs.maze_graph import MazeGraph
+from src.graphs.pruning import fill_dead_ends
+from src.graphs.rewards import order_rewards
+from src.graphs.search import (
+    astar,
+    bellman_ford,
+    dial,
+    dijkstra,
+    euclidean,
+    manhattan,
+    select_search,
+)
+from src.graphs.solver import (
+    is_solvable,
+    iter_solutions,
+    path_to_exit,
+    shortest_paths,
+    solve,
+    solve_all,
+    solve_many,
+    solve_networkx,
+)
+from src.graphs.weight_model import WeightModel
+from src.models.border import Border
+from src.models.maze import Maze
+from src.models.role import Role
+from src.models.square import Square
+from src.persistence.solutions import load_solutions
+
+MAZES = Path(__file__).parent.parent / "resources" / "mazes"
+
+MAZE_STRING = """\
+#########E#
+#   # # # #
+# ### # # #
+#         #
+# #########
+#     # # #
+### ### # #
+#   #     #
+# # ### # #
+# #     # #
+#####S#####"""
+
+
+@pytest.fixture
+def maze() -> Maze:
+    return string_to_maze(MAZE_STRING)
+
+
+@pytest.fixture
+def pacman() -> Maze:
+    return Maze.load(MAZES / "pacman.maze")
+
+
+def path_weight(maze: Maze, solution) -> float:
+    return nx.path_weight(make_graph(maze), list(solution), "weight")
+
+
+def random_maze(seed: int, width: int = 7, height: int = 6) -> Maze:
+    # rewards, enemies, and walls scattered, borders drawn on each square on its own
+    rng = random.Random(seed)
+    roles = rng.choices(
+        [Role.NONE, Role.REWARD, Role.ENEMY, Role.WALL], [14, 3, 1, 1], k=width * height
+    )
+    entrance, exit_ = rng.sample(range(width * height), 2)
+    roles[entrance], roles[exit_] = Role.ENTRANCE, Role.EXIT
+    borders = (sum(bit for bit in Border if rng.random() < 0.3) for _ in roles)
+    return Maze(width, height, bytes(role << 4 | border for role, border in zip(roles, borders)))
+
+
+def assert_matches_networkx(maze: Maze, backend: str, **options) -> None:
+    expected = solve(maze, backend="networkx")
+    solution = solve(maze, backend=backend, **options)
+    assert (solution is None) == (expected is None)
+    if expected is not None:
+        assert path_weight(maze, solution) == path_weight(maze, expected)
+
+
+def test_solve_native(maze):
+    solution = solve(maze)
+    assert [square.index for square in solution] == [22, 21, 16, 11, 10, 5, 6, 7, 8, 9, 4]
+
+
+@pytest.mark.parametrize("backend", ["native", "bidirectional", "jump"])
+def test_solve_matches_networkx(pacman, backend):
+    expected = path_weight(pacman, solve(pacman, backend="networkx"))
+    assert path_weight(pacman, solve(pacman, backend=backend)) == expected
+    for seed in range(400):
+        assert_matches_networkx(random_maze(seed), backend)
+
+
+@pytest.mark.parametrize("bonus, search", [(1, dial), (0.5, dijkstra), (1.5, bellman_ford)])
+def test_select_search_matches_networkx(pacman, bonus, search):
+    assert select_search(MazeGraph.from_maze(pacman, bonus=bonus)) is search
+    graph = make_graph(pacman, bonus=bonus)
+    expected = nx.path_weight(graph, list(solve(pacman, backend="networkx", bonus=bonus)), "weight")
+    assert nx.path_weight(graph, list(solve(pacman, bonus=bonus)), "weight") == expected
+
+
+@pytest.mark.parametrize("bonus, penalty", [(1, 2), (0, 5)])
+def test_reweight_matches_from_maze(pacman, bonus, penalty):
+    graph = get_maze_graph(pacman)
+    reweighted = graph.reweight(pacman, WeightModel.from_options(bonus, penalty))
+    assert reweighted.targets is graph.targets
+    assert (reweighted.weights == MazeGraph.from_maze(pacman, bonus=bonus, penalty=penalty).weights).all()
+
+
+def test_solve_weighted(pacman):
+    model = WeightModel.from_options()
+    assert path_weight(pacman, solve(pacman, backend="weighted", model=model)) == path_weight(
+        pacman, solve(pacman)
+    )
+    # squares of the default solution cost too much to enter, so another path is taken
+    indices = [square.index for square in solve(pacman)]
+    cell_costs = np.zeros(pacman.width * pacman.height)
+    cell_costs[indices[1:-1]] = 100
+    model = WeightModel.from_roles({}, cell_costs)
+    assert [square.index for square in solve(pacman, backend="weighted", model=model)] != indices
+
+
+def test_solve_weighted_contract():
+    # contracted edges enter every square of their corridor, each with its own cost
+    for seed in range(300):
+        maze = random_maze(seed, 9, 8)
+        cell_costs = np.random.default_rng(seed).integers(0, 6, maze.width * maze.height)
+        model = WeightModel.from_roles({Role.ENEMY: 2}, cell_costs)
+        graph = get_weighted_graph(maze, model).to_networkx()
+        expected = solve(maze, backend="weighted", model=model)
+        solution = solve(maze, backend="weighted", model=model, contract=True)
+        assert (solution is None) == (expected is None)
+        if expected is not None:
+            assert nx.path_weight(
+                graph, [square.index for square in solution], "weight"
+            ) == nx.path_weight(graph, [square.index for square in expected], "weight")
+
+
+@pytest.mark.parametrize("backend", ["native", "astar", "bidirectional", "jump", "networkx"])
+def test_negative_cycle(pacman, backend):
+    # neighbors of a reward step into it and back out for less than nothing
+    with pytest.raises(ValueError):
+        solve(pacman, backend=backend, bonus=3)
+
+
+def test_negative_cycle_networkx(pacman):
+    with pytest.raises(ValueError):
+        solve_networkx(pacman, bonus=3)
+
+
+@pytest.mark.parametrize("backend", ["astar", "bidirectional", "jump", "tiled", "rewards"])
+def test_negative_edges_rejected(pacman, backend):
+    with pytest.raises(ValueError):
+        solve(pacman, backend=backend, bonus=1.5)
+
+
+def test_negative_edges_rejected_by_shortest_paths(pacman):
+    with pytest.raises(ValueError):
+        shortest_paths(pacman, bonus=1.5)
+    with pytest.raises(ValueError):
+        path_to_exit(pacman, pacman.roles.entrance, bonus=1.5)
+
+
+@pytest.mark.parametrize("heuristic", [manhattan, euclidean])
+def test_solve_astar_matches_networkx(pacman, heuristic):
+    expected = path_weight(pacman, solve(pacman, backend="networkx"))
+    assert path_weight(pacman, solve(pacman, backend="astar", heuristic=heuristic)) == expected
+
+
+@pytest.mark.parametrize("heuristic", [manhattan, euclidean])
+def test_solve_astar_matches_networkx_with_rewards(heuristic):
+    for seed in range(400):
+        assert_matches_networkx(random_maze(seed), "astar", heuristic=heuristic)
+
+
+def test_astar_open_room(monkeypatch):
+    # every square of an empty room is on a shortest path from corner to corner
+    size = 30
+    values = np.zeros((size, size), dtype=np.uint8)
+    values[0] |= np.uint8(Border.TOP)
+    values[:, 0] |= np.uint8(Border.LEFT)
+    values[-1] |= np.uint8(Border.BOTTOM)
+    values[:, -1] |= np.uint8(Border.RIGHT)
+    values[0, 0] |= np.uint8(Role.ENTRANCE << 4)
+    values[-1, -1] |= np.uint8(Role.EXIT << 4)
+    graph = MazeGraph.from_maze(Maze(size, size, values.tobytes()))
+    popped = []
+    heappop = heapq.heappop
+    monkeypatch.setattr(heapq, "heappop", lambda frontier: popped.append(1) or heappop(frontier))
+    path = astar(graph, 0, size * size - 1)
+    assert len(path) == 2 * size - 1
+    assert len(popped) == len(path)
+
+
+@pytest.mark.parametrize("backend", ["native", "networkx"])
+def test_solve_contract_matches_networkx(backend):
+    for seed in range(400):
+        assert_matches_networkx(random_maze(seed), backend, contract=True)
+
+
+def test_contract_follows_one_sided_borders():
+    # square 29 is closed on every side of its own, yet entered past borders of 28 and 19
+    values = [0x0F] * 30
+    values[28] = Role.ENTRANCE << 4 | Border.TOP | Border.LEFT | Border.BOTTOM
+    values[19] = Role.EXIT << 4 | Border.TOP | Border.LEFT | Border.RIGHT
+    maze = Maze(10, 3, bytes(values))
+    assert [square.index for square in solve(maze, contract=True)] == [28, 29, 19]
+
+
+def test_make_graph_contract(maze):
+    assert make_graph(maze, contract=True).number_of_nodes() < make_graph(maze).number_of_nodes()
+    assert solve(maze, backend="networkx", contract=True) == solve(maze, backend="networkx")
+
+
+@pytest.mark.parametrize("contract", [False, True])
+def test_maze_graph_matches_make_graph(pacman, contract):
+    expected = {
+        (edge[0].index, edge[1].index, edge[2])
+        for edge in make_graph(pacman, contract).edges.data("weight")
+    }
+    graph = MazeGraph.from_maze(pacman, contract).to_networkx()
+    assert set(graph.edges.data("weight")) == expected
+
+
+def test_iter_solutions_matches_networkx(pacman):
+    expected = {
+        tuple(square.index for square in path)
+        for path in nx.all_shortest_paths(
+            make_graph(pacman), pacman.entrance, pacman.exit, weight="weight"
+        )
+    }
+    solutions = [tuple(square.index for square in solution) for solution in iter_solutions(pacman)]
+    assert len(solutions) == len(expected)
+    assert set(solutions) == expected
+    assert len(solve_all(pacman, max_paths=3)) == 3
+
+
+def test_solve_all_neighboring_rewards():
+    # open room, rewards between entrance in top left and exit in bottom right
+    maze = Maze(3, 2, bytes([0x23, 0x51, 0x59, 0x56, 0x54, 0x3C]))
+    expected = {
+        tuple(square.index for square in path)
+        for path in nx.all_shortest_paths(
+            make_graph(maze), maze.entrance, maze.exit, weight="weight"
+        )
+    }
+    solutions = {tuple(square.index for square in solution) for solution in solve_all(maze)}
+    assert solutions == expected
+    assert (0, 3, 4, 1, 2, 5) in solutions
+    assert len(solve_all(maze, max_paths=2)) == 2
+
+
+def test_shortest_paths(pacman):
+    paths = shortest_paths(pacman)
+    enumerated = list(paths)
+    assert paths.count() == len(enumerated)
+    assert enumerated == sorted(enumerated)
+    assert paths.sample(random.Random(0)) in enumerated
+    random.seed(0)
+    sampled = [paths.sample() for _ in range(20)]
+    random.seed(0)
+    assert [paths.sample() for _ in range(20)] == sampled
+
+
+def test_shortest_paths_match_networkx():
+    # neighboring rewards are joined by edges that weigh zero both ways
+    for seed in range(400):
+        maze = random_maze(seed)
+        graph = make_graph(maze)
+        expected = []
+        if {maze.entrance, maze.exit} <= set(graph) and nx.has_path(graph, maze.entrance, maze.exit):
+            expected = sorted(
+                [square.index for square in path]
+                for path in nx.all_shortest_paths(graph, maze.entrance, maze.exit, weight="weight")
+            )
+        paths = shortest_paths(maze)
+        assert paths.count() == len(expected)
+        assert list(paths) == expected
+        assert paths.sample(random.Random(seed)) in (expected or [None])
+
+
+@pytest.mark.parametrize("backend", ["native", "tiled", "rewards", "networkx"])
+def test_solve_without_exit(maze, backend):
+    values = bytes(value & 0xF if value >> 4 == Role.EXIT else value for value in maze.values)
+    with pytest.raises(ValueError):
+        solve(Maze(maze.width, maze.height, values, trusted=True), backend=backend)
+
+
+def test_solve_unknown_backend(maze):
+    with pytest.raises(ValueError):
+        solve(maze, backend="unknown")
+
+
+def test_graph_cache(maze):
+    cache = GraphCache(max_items=1)
+    graph = get_maze_graph(maze, cache=cache)
+    assert get_maze_graph(maze, cache=cache) is graph
+    assert get_maze_graph(maze, bonus=2, cache=cache) is not graph
+    assert (cache.hits, cache.misses, len(cache)) == (1, 2, 1)
+
+
+def test_solve_solutions_file(tmp_path, maze):
+    path = tmp_path / "maze.maze"
+    maze.dump(path)
+    solution = solve(maze, path=path)
+    assert (tmp_path / "maze.solutions").exists()
+    assert load_solutions(path, maze.digest) == {"solve:native:": [[square.index for square in solution]]}
+    assert solve(maze, path=path) == solution
+    assert load_solutions(path, "0" * 32) == {}
+
+
+def test_solve_solutions_file_heuristic(tmp_path, maze):
+    path = tmp_path / "maze.maze"
+    maze.dump(path)
+    solve(maze, backend="astar", path=path, heuristic=manhattan)
+    assert list(load_solutions(path, maze.digest)) == [
+        "solve:astar:heuristic=src.graphs.search.manhattan"
+    ]
+    # lambdas share one name, so their solutions are never cached
+    solve(maze, backend="astar", path=path, heuristic=lambda *args: 0)
+    assert len(load_solutions(path, maze.digest)) == 1
+
+
+def test_solve_many(tmp_path, maze, pacman):
+    paths = [tmp_path / "maze.maze", tmp_path / "pacman.maze"]
+    maze.dump(paths[0])
+    pacman.dump(paths[1])
+    results = dict(solve_many(paths, workers=2))
+    assert results[paths[0]] == [22, 21, 16, 11, 10, 5, 6, 7, 8, 9, 4]
+    assert path_weight(pacman, [pacman[index] for index in results[paths[1]]]) == path_weight(
+        pacman, solve(pacman)
+    )
+
+
+def test_solve_many_bad_file(tmp_path, maze):
+    paths = [tmp_path / "maze.maze", tmp_path / "broken.maze"]
+    maze.dump(paths[0])
+    paths[1].write_bytes(b"not a maze")
+    results = dict(solve_many(paths, workers=1))
+    assert results[paths[0]] == [22, 21, 16, 11, 10, 5, 6, 7, 8, 9, 4]
+    assert isinstance(results[paths[1]], Exception)
+
+
+def test_solve_many_stops_early(tmp_path, maze):
+    paths = [tmp_path / f"maze{number}.maze" for number in range(20)]
+    for path in paths:
+        maze.dump(path)
+    results = solve_many(paths, workers=1)
+    next(results)
+    results.close()
+    # mazes not started when iteration stopped are never solved
+    assert len(list(tmp_path.glob("*.solutions"))) < len(paths)
+
+
+@pytest.mark.parametrize("tile_size", [3, 8])
+def test_solve_tiled_matches_networkx(pacman, tile_size):
+    expected = path_weight(pacman, solve(pacman, backend="networkx"))
+    assert path_weight(pacman, solve(pacman, backend="tiled", tile_size=tile_size, workers=2)) == expected
+    for seed in range(40):
+        assert_matches_networkx(random_maze(seed, 12, 10), "tiled", tile_size=tile_size, workers=1)
+
+
+def test_solve_tiled_builds_nothing_whole():
+    # maze is not used by any other test, so nothing of it is cached yet
+    maze = random_maze(1000, 12, 10)
+    solve(maze, backend="tiled", tile_size=4, workers=1)
+    assert not any(key[0] == maze.digest for key in GRAPH_CACHE.graphs)
+
+
+@pytest.mark.parametrize("avoid_enemies", [False, True])
+def test_solve_rewards(pacman, avoid_enemies):
+    solution = solve(pacman, backend="rewards", avoid_enemies=avoid_enemies, workers=2)
+    indices = {square.index for square in solution}
+    assert set(pacman.roles.rewards) <= indices
+    assert not avoid_enemies or not set(pacman.roles.enemies) & indices
+
+
+def test_solve_rewards_open_mmap(pacman, tmp_path):
+    pacman.dump(tmp_path / "pacman.maze")
+    mapped = Maze.open_mmap(tmp_path / "pacman.maze")
+    expected = solve(pacman, backend="rewards", workers=2)
+    assert solve(mapped, backend="rewards", workers=2) == expected
+
+
+def test_order_rewards():
+    # entrance, two rewards, exit, cheapest route visits second reward first
+    distances = np.array([
+        [0, 5, 1, 9],
+        [5, 0, 2, 1],
+        [1, 2, 0, 9],
+        [9, 1, 9, 0],
+    ], dtype=float)
+    assert order_rewards(distances) == [1, 0]
+    distances[1:3, 3] = np.inf
+    assert order_rewards(distances) is None
+
+
+def test_path_to_exit(pacman):
+    expected = path_weight(pacman, solve(pacman))
+    path = path_to_exit(pacman, pacman.roles.entrance)
+    assert path_weight(pacman, [pacman[index] for index in path]) == expected
+    assert get_distance_field(pacman).distance(pacman.roles.entrance) == expected
+    assert path_to_exit(pacman, pacman.roles.exit) == [pacman.roles.exit]
+
+
+def test_incremental_solver(pacman):
+    solver = IncrementalSolver.from_maze(pacman)
+    path = solver.solve()
+    assert path_weight(pacman, [pacman[index] for index in path]) == path_weight(pacman, solve(pacman))
+    # close the square in the middle of the path on every side
+    square = pacman[path[len(path) // 2]]
+    solver.update([Square(square.index, square.row, square.column, Border(15), square.role)])
+    edited = solver.maze
+    expected = solve(edited, backend="networkx")
+    path = solver.solve()
+    assert square.index not in path
+    assert path_weight(edited, [edited[index] for index in path]) == path_weight(edited, expected)
+
+
+def test_fill_dead_ends(pacman):
+    pruned = fill_dead_ends(pacman)
+    assert len(MazeGraph.from_maze(pruned).targets) < len(MazeGraph.from_maze(pacman).targets)
+    assert pruned.roles.entrance == pacman.roles.entrance
+    expected = path_weight(pacman, solve(pacman))
+    assert path_weight(pacman, solve(pacman, prune=True)) == expected
+
+
+def test_is_solvable(pacman):
+    impossible = Maze.load(MAZES / "impossible.maze")
+    assert not is_solvable(impossible)
+    assert solve(impossible) is None
+    assert is_solvable(pacman)
+    labels = label_components(pacman)
+    assert labels[pacman.roles.entrance] == labels[pacman.roles.exit]